@@ -4,16 +4,38 @@
 Package for BattleshipSimulator.
 """
 
-from pkg_resources import get_distribution, DistributionNotFound
+import sys
 
 __project__ = 'BattleshipSimulator'
-__version__ = None  # required for initial installation
 
 __cli__ = 'battleship'
 
-try:
-    __version__ = get_distribution(__project__).version  # pylint: disable=E1103
-except DistributionNotFound:  # pragma: no cover, manual test
-    VERSION = __project__ + '-' + '(local)'
-else:
-    VERSION = __project__ + '-' + __version__
+
+def _get_version():
+    """Return the installed version of the package, or None if it is not installed."""
+    try:
+        from importlib.metadata import version, PackageNotFoundError
+    except ImportError:  # pragma: no cover, Python < 3.8
+        from pkg_resources import get_distribution, DistributionNotFound
+        try:
+            return get_distribution(__project__).version  # pylint: disable=E1103
+        except DistributionNotFound:
+            return None
+    try:
+        return version(__project__)
+    except PackageNotFoundError:  # pragma: no cover, manual test
+        return None
+
+
+def __getattr__(name):
+    """Look up version information on first use so importing the package stays fast."""
+    if name == '__version__':
+        return _get_version()
+    if name == 'VERSION':
+        return __project__ + '-' + (_get_version() or '(local)')
+    raise AttributeError(name)
+
+
+if sys.version_info < (3, 7):  # pragma: no cover, module __getattr__ is not supported
+    __version__ = _get_version()
+    VERSION = __getattr__('VERSION')
@@ -0,0 +1,10 @@
+#!/usr/bin/env python
+
+"""
+Entry point for running the package with 'python -m battleship'.
+"""
+
+from battleship.main import main
+
+if __name__ == '__main__':  # pragma: no cover
+    main()
@@ -0,0 +1,220 @@
+#!/usr/bin/env python
+
+"""
+Interleaved simulation of many games with batched Monte Carlo sampling.
+
+Games are played in lockstep, a limited number at a time. On each round, every
+game that needs Monte Carlo sampling submits a request to a scheduler, which
+runs all of the requests as a single job using ship position tables shared by
+every game and one flat array of frequency totals.
+
+The scheduler removes ship positions that cross guessed cells before drawing
+any samples, so its placements are not distributed exactly like those of the
+rejection sampler in montecarlo.Player.
+"""
+
+import time
+import random
+import logging
+
+from battleship.game import ROWS, COLS, StepCounter, PlacementGrid, ShotsGrid
+from battleship import montecarlo
+from battleship import settings
+
+BATCH_SIZE = 1000  # maximum number of games played in lockstep
+
+
+class PositionTable(object):
+    """Ship positions on an empty grid, as tuples of cell indices."""
+
+    def __init__(self, rows=ROWS, cols=COLS):
+        self.rows = rows
+        self.cols = cols
+        self.cells = rows * cols
+        self.grid = PlacementGrid(rows, cols)
+        self.positions = {}
+
+    def get(self, length):
+        """Return the positions of a ship with the given length."""
+        try:
+            return self.positions[length]
+        except KeyError:
+            positions = [tuple((row - 1) * self.cols + col - 1 for row, col in cells)
+                         for cells in self.grid.get_positions(length)]
+            self.positions[length] = positions
+            return positions
+
+
+class Scheduler(object):
+    """Collects sampling requests from many games and executes them together.
+
+    Unlike montecarlo.Player, which draws positions on the whole grid and
+    rejects samples crossing guessed cells, each request only draws from the
+    positions that avoid guessed cells, retrying overlapping ships a limited
+    number of times.
+    """
+
+    def __init__(self, rows=ROWS, cols=COLS):
+        self.table = PositionTable(rows, cols)
+        self.requests = []
+
+    def submit(self, shots, ships, sample_size, counter=None):
+        """Add a request for Monte Carlo frequencies.
+
+        @param shots: ShotsGrid of shots already taken
+        @param ships: lengths of the remaining ships
+        @param sample_size: number of random placements to generate
+        @param counter: StepCounter to increment for each sample
+        @return: index of the request's result from execute()
+        """
+        blocked = frozenset((row - 1) * self.table.cols + col - 1 for row, col in shots.get_guessed_cells())
+        self.requests.append((shots, blocked, ships, sample_size, counter))
+        return len(self.requests) - 1
+
+    def execute(self):
+        """Run all submitted requests as a single job.
+
+        @return: list of FrequencyGrid for each request in order of submission
+        """
+        requests, self.requests = self.requests, []
+        cells = self.table.cells
+        totals = [0] * (cells * len(requests))
+        for index, (_shots, blocked, ships, sample_size, counter) in enumerate(requests):
+            offset = index * cells
+            # Remove positions crossing guessed cells once for all samples
+            candidates = [[position for position in self.table.get(length) if blocked.isdisjoint(position)]
+                          for length in ships]
+            for _sample in range(sample_size):
+                if counter:
+                    counter.increment()
+                occupied = set()
+                for positions in candidates:
+                    if not positions:
+                        continue
+                    for _attempt in range(PlacementGrid.MAX_PLACEMENT_ATTEMPTS):
+                        position = random.choice(positions)
+                        if occupied.isdisjoint(position):
+                            occupied.update(position)
+                            break
+                for cell in occupied:
+                    totals[offset + cell] += 1
+        logging.debug("executed {0} sampling requests".format(len(requests)))
+        # Split the totals into frequency grids
+        results = []
+        for index, (shots, _blocked, _ships, _sample_size, _counter) in enumerate(requests):
+            frequencies = montecarlo.FrequencyGrid(self.table.rows, self.table.cols)
+            offset = index * cells
+            frequencies.grid = [totals[offset + row * self.table.cols:offset + (row + 1) * self.table.cols]
+                                for row in range(self.table.rows)]
+            frequencies.set_guessed_cells(shots.get_guessed_cells())
+            results.append(frequencies)
+        return results
+
+
+class Game(object):
+    """State of a single game being simulated in a batch."""
+
+    def __init__(self, player, placements=None):
+        self.player = player
+        if placements is None:
+            placements = PlacementGrid()
+            placements.initialize()
+        self.placements = placements
+        self.shots = ShotsGrid()
+        self.counter = StepCounter()
+        self.cells = []
+        self.duration = 0.0
+
+    def guess(self, row, col):
+        """Take a shot and report it to the player."""
+        hit = self.shots.guess(row, col, self.placements)
+        self.player.observe(row, col, hit)
+        self.cells.append((row, col))
+
+
+def supports(strategy):
+    """Determine if games using the named strategy can be batched.
+
+    The scheduler only draws unweighted samples in Python (with its own
+    placement method), so strategies that override Player.accumulate are
+    played one game at a time.
+    """
+    cls = montecarlo.STRATEGIES.get(strategy)
+    if cls is None or not issubclass(cls, montecarlo.Player):
+        return False
+    default = montecarlo.Player.accumulate
+    # Compare the underlying functions, as Python 2 creates a new unbound method on each access
+    return getattr(cls.accumulate, '__func__', cls.accumulate) is getattr(default, '__func__', default)
+
+
+def simulate(sample_size, count, strategy='montecarlo', boards=None, recorder=None, batch_size=BATCH_SIZE):
+    """Play several games in lockstep with batched Monte Carlo sampling.
+
+    @param sample_size: number of samples for the Monte Carlo algorithm, 0 for random guessing
+    @param count: number of games to play
+    @param strategy: name of a registered strategy based on montecarlo.Player
+    @param boards: list of PlacementGrid to play against in turn (default: new random playing fields)
+    @param recorder: record.Writer to save the board and shots of each game
+    @param batch_size: maximum number of games to play at once
+    @return: list of (guesses, steps, duration) for each game in order
+    """
+    if not supports(strategy):
+        raise ValueError("strategy cannot be batched: {0}".format(strategy))
+    if batch_size < 1:
+        raise ValueError("batch size must be positive: {0}".format(batch_size))
+    scheduler = Scheduler()
+    results = []
+    for first in range(0, count, batch_size):
+        games = [Game(montecarlo.get_strategy(strategy, sample_size), boards[index % len(boards)] if boards else None)
+                 for index in range(first, min(first + batch_size, count))]
+        play(games, scheduler, sample_size, recorder)
+        results.extend((len(current.cells), current.counter.value(), current.duration) for current in games)
+    logging.info("completed {0} games in batches of up to {1}".format(count, batch_size))
+    return results
+
+
+def play(games, scheduler, sample_size, recorder=None):
+    """Play games in lockstep until every game is won.
+
+    @param games: list of Game to play
+    @param scheduler: Scheduler to run the sampling requests
+    @param sample_size: number of samples for the Monte Carlo algorithm, 0 for random guessing
+    @param recorder: record.Writer to save the board and shots of each game
+    """
+    active = list(games)
+    while active:
+        # Guess targets and collect sampling requests
+        pending = []
+        for current in active:
+            start = time.time()
+            shots, player = current.shots, current.player
+            target_cells = player.get_target_cells(shots)
+            if target_cells:
+                current.guess(*player.get_random_guess(shots, target_cells, current.counter))
+            else:
+                ships = shots.get_remaining_ships()
+                candidate_cells = player.get_candidate_cells(shots, ships)
+                pending.append((current, candidate_cells, scheduler.submit(shots, ships, sample_size,
+                                                                           current.counter)))
+            current.duration += time.time() - start
+
+        # Sample for every waiting game at once and share the time between them
+        if pending:
+            start = time.time()
+            frequencies = scheduler.execute()
+            share = (time.time() - start) / len(pending)
+            for current, candidate_cells, index in pending:
+                start = time.time()
+                current.guess(*random.choice(frequencies[index].get_best_cells(candidate_cells)))
+                current.duration += time.time() - start + share
+
+        # Remove completed games
+        for current in [current for current in active if current.shots.is_won()]:
+            active.remove(current)
+            if recorder:
+                recorder.write(sample_size, current.placements, current.cells)
+    logging.debug("completed a batch of {0} games".format(len(games)))
+
+
+if __name__ == '__main__':  # pragma: no cover
+    logging.basicConfig(format=settings.DEFAULT_LOGGING_FORMAT, level=settings.DEFAULT_LOGGING_LEVEL)
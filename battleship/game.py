@@ -7,7 +7,7 @@ Simulation of the battleship board game.
 import random
 import logging
 
-import settings
+from battleship import settings
 
 # Battleship constants
 ROWS = 10
@@ -15,6 +15,46 @@ COLS = 10
 SHIPS = (5, 4, 3, 3, 2)
 ROTATION = (0, 90, 180, 270)
 
+_NEIGHBORS = {}  # cache of adjacency tables for each grid size
+
+
+def get_neighbors(rows, cols):
+    """Return a table of the cells adjacent to each cell on a grid of the given size.
+
+    @param rows: number of rows on the grid
+    @param cols: number of columns on the grid
+    @return: dictionary of adjacent cells: {(row, col): ((row, col), ...)}
+    """
+    try:
+        return _NEIGHBORS[(rows, cols)]
+    except KeyError:
+        table = {}
+        for row in range(1, rows + 1):
+            for col in range(1, cols + 1):
+                table[(row, col)] = tuple((_row, _col) for _row, _col in ((row - 1, col), (row + 1, col),
+                                                                          (row, col - 1), (row, col + 1))
+                                          if 1 <= _row <= rows and 1 <= _col <= cols)
+        _NEIGHBORS[(rows, cols)] = table
+        return table
+
+
+class StepCounter(object):
+    """Basic counter to store the number of steps taken during an algorithm."""
+
+    def __init__(self):
+        self.steps = 0
+
+    def __int__(self):
+        return self.steps
+
+    def increment(self):
+        """Increment counter."""
+        self.steps += 1
+
+    def value(self):
+        """Return counter's value."""
+        return self.steps
+
 
 class Grid(object):
     """Generic Battleship grid. The top left corner is (1,1)."""
@@ -111,6 +151,53 @@ class PlacementGrid(Grid):
                     break
         logging.debug("random sample placement:\n{0}".format(self))
 
+    def sample_weighted(self, ships, positions=None):
+        """Place more ships using sequential importance sampling.
+
+        Ships are placed in a random order, each uniformly among all of its free
+        positions. Weighting the sample by the number of choices available at each
+        step makes weighted totals estimate the uniform distribution over complete
+        fleet configurations, which fixed-order rejection sampling does not.
+
+        @param ships: lengths of remaining ships to place
+        @param positions: dictionary of candidate positions for each length (see get_positions)
+        @return: weight of the sample, 0 if the ships could not all be placed
+        """
+        order = list(ships)
+        random.shuffle(order)
+        weight = 1
+        for length in order:
+            if positions and length in positions:
+                free = [cells for cells in positions[length] if all(self.is_empty(row, col) for row, col in cells)]
+            else:
+                free = self.get_positions(length)
+            if not free:
+                logging.debug("no free positions for a {0}-cell ship".format(length))
+                return 0
+            weight *= len(free)
+            for row, col in random.choice(free):
+                self.set_cell(row, col, self.PLACEMENT)
+        logging.debug("weighted sample placement ({0}):\n{1}".format(weight, self))
+        return weight
+
+    def get_positions(self, length):
+        """Return every free position for a ship of the given length.
+
+        @param length: number of cells occupied by the ship
+        @return: list of positions, each a tuple of (row, col) cells
+        """
+        positions = []
+        steps = ((0, 1), (1, 0)) if length > 1 else ((0, 1),)
+        for row in range(1, self.rows + 1):
+            for col in range(1, self.cols + 1):
+                for row_step, col_step in steps:
+                    if row + row_step * (length - 1) > self.rows or col + col_step * (length - 1) > self.cols:
+                        continue
+                    cells = tuple((row + row_step * index, col + col_step * index) for index in range(length))
+                    if all(self.is_empty(_row, _col) for _row, _col in cells):
+                        positions.append(cells)
+        return positions
+
     def place(self, row, col, length, rotation=0):
         """Place a ship with the given length and rotation.
 
@@ -163,16 +250,36 @@ class PlacementGrid(Grid):
 
 
 class ShotsGrid(Grid):
-    """Representation of a shots taken against a Battleship field."""
+    """Representation of a shots taken against a Battleship field.
+
+    Sets of the hit and unguessed cells are kept up to date as cells are set,
+    so targeting does not need to scan the grid.
+    """
 
     UNGUESSED, HIT, MISS = range(3)
     FORMAT = {UNGUESSED: ' ',
               HIT: 'X',
               MISS: '*'}
 
+    def __init__(self, rows=ROWS, cols=COLS):
+        super(ShotsGrid, self).__init__(rows, cols)
+        self.hit_cells = set()
+        self.unguessed_cells = set((row, col) for row in range(1, rows + 1) for col in range(1, cols + 1))
+
+    def set_cell(self, row, col, value):
+        """Set value of cell (index starts at 1) and update the sets of cells."""
+        super(ShotsGrid, self).set_cell(row, col, value)
+        cell = (row, col)
+        self.hit_cells.discard(cell)
+        self.unguessed_cells.discard(cell)
+        if value == self.HIT:
+            self.hit_cells.add(cell)
+        elif value == self.UNGUESSED:
+            self.unguessed_cells.add(cell)
+
     def get_hit_cells(self):
         """Return a list of hit cells."""
-        return [cell for cell, value in self if value == self.HIT]
+        return sorted(self.hit_cells)
 
     def get_missed_cells(self):
         """Return a list of missed cells."""
@@ -184,17 +291,37 @@ class ShotsGrid(Grid):
 
     def get_unguessed_cells(self):
         """Return a list of unguessed cells."""
-        return [cell for cell, _value in self if cell not in self.get_guessed_cells()]
-
-    def get_target_cells(self):
-        """Return a list of unguessed cells adjacent to hit cells."""
-        target_cells = []
-        unguessed_cells = self.get_unguessed_cells()
-        for row, col in self.get_hit_cells():
-            for adjacent_cell in ((row - 1, col), (row + 1, col), (row, col - 1), (row, col + 1)):
-                if adjacent_cell in unguessed_cells:
-                    target_cells.append(adjacent_cell)
-        return target_cells
+        return [cell for cell, value in self if value == self.UNGUESSED]
+
+    def get_parity_cells(self, length):
+        """Return a list of unguessed cells on the lattice every ship of the given length must cross."""
+        return [(row, col) for (row, col), value in self if value == self.UNGUESSED and (row + col) % length == 0]
+
+    def get_target_cells(self, line=False):
+        """Return a sorted list of unguessed cells adjacent to hit cells.
+
+        @param line: when hits form a line, only target the cells extending it (if any)
+        @return: list of unique target cells
+        """
+        hit_cells = self.hit_cells
+        unguessed_cells = self.unguessed_cells
+        target_cells = set()
+        if line:
+            for row, col in hit_cells:
+                for row_step, col_step in ((1, 0), (0, 1)):
+                    if (row + row_step, col + col_step) in hit_cells:
+                        for step in (1, -1):
+                            _row, _col = row, col
+                            while (_row, _col) in hit_cells:
+                                _row, _col = _row + row_step * step, _col + col_step * step
+                            if (_row, _col) in unguessed_cells:
+                                target_cells.add((_row, _col))
+            if target_cells:
+                return sorted(target_cells)
+        neighbors = get_neighbors(self.rows, self.cols)
+        for cell in hit_cells:
+            target_cells.update(adjacent_cell for adjacent_cell in neighbors[cell] if adjacent_cell in unguessed_cells)
+        return sorted(target_cells)
 
     def guess(self, row, col, grid):
         """Guess a cell in the opponent's grid.
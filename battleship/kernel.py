@@ -0,0 +1,138 @@
+#!/usr/bin/env python
+
+"""
+Placement sampling kernel with an optional compiled implementation.
+
+The kernel is written in a restricted style (flat integer buffers, integer
+loops, its own xorshift random number generator) so the same source runs as
+plain Python or is compiled by Numba when it is installed. Both produce
+identical counts for the same seed.
+"""
+
+import logging
+
+try:
+    import numba
+    import numpy
+except ImportError:  # pragma: no cover, optional dependencies
+    numba = None
+    numpy = None
+
+from battleship.game import PlacementGrid
+from battleship import settings
+
+EMPTY, PLACEMENT, BLOCKED = range(3)
+MASK = 0xFFFFFFFF
+
+
+def _sample(rows, cols, blocked, ships, count, seed, attempts, grid, counts):
+    """Place ships in random free positions and accumulate occupied cells.
+
+    Ships are placed in order using the same rejection sampling as
+    PlacementGrid.sample: each ship gets a number of attempts at a random
+    cell and rotation, and is skipped if none of them fit.
+
+    @param rows: number of rows on the grid
+    @param cols: number of columns on the grid
+    @param blocked: buffer with a non-zero value for each cell that cannot contain a ship
+    @param ships: buffer of ship lengths
+    @param count: number of samples
+    @param seed: non-zero state of the random number generator
+    @param attempts: maximum number of attempts to place each ship
+    @param grid: scratch buffer for one sample
+    @param counts: buffer that receives the number of samples occupying each cell
+    @return: final state of the random number generator
+    """
+    state = seed
+    cells = rows * cols
+    for _sample_index in range(count):
+        for cell in range(cells):
+            grid[cell] = BLOCKED if blocked[cell] else EMPTY
+        for ship in range(len(ships)):
+            length = ships[ship]
+            for _attempt in range(attempts):
+                state ^= (state << 13) & MASK
+                state ^= state >> 17
+                state ^= (state << 5) & MASK
+                row = state % rows
+                state ^= (state << 13) & MASK
+                state ^= state >> 17
+                state ^= (state << 5) & MASK
+                col = state % cols
+                state ^= (state << 13) & MASK
+                state ^= state >> 17
+                state ^= (state << 5) & MASK
+                rotation = state % 4
+                row_step = 0
+                col_step = 1
+                if rotation == 1:
+                    row_step = -1
+                    col_step = 0
+                elif rotation == 2:
+                    col_step = -1
+                elif rotation == 3:
+                    row_step = 1
+                    col_step = 0
+                free = True
+                for index in range(length):
+                    _row = row + row_step * index
+                    _col = col + col_step * index
+                    if _row < 0 or _row >= rows or _col < 0 or _col >= cols or grid[_row * cols + _col] != EMPTY:
+                        free = False
+                        break
+                if free:
+                    for index in range(length):
+                        grid[(row + row_step * index) * cols + col + col_step * index] = PLACEMENT
+                    break
+        for cell in range(cells):
+            if grid[cell] == PLACEMENT:
+                counts[cell] += 1
+    return state
+
+
+_compiled = numba.njit(cache=True)(_sample) if numba else None
+
+
+def is_compiled():
+    """Determine if the compiled kernel is available."""
+    return _compiled is not None
+
+
+def sample_counts(rows, cols, blocked_cells, ships, count, seed=1, compiled=None):
+    """Sample fleets of ships around blocked cells and count the occupied cells.
+
+    @param rows: number of rows on the grid
+    @param cols: number of columns on the grid
+    @param blocked_cells: list of (row, col) cells that cannot contain a ship
+    @param ships: lengths of the ships to place
+    @param count: number of samples
+    @param seed: seed for the random number generator
+    @param compiled: use the compiled kernel (default: when available)
+    @return: list of counts for each cell, row by row
+    """
+    cells = rows * cols
+    seed = (seed & MASK) or 1  # xorshift requires a non-zero state
+    if compiled is None:
+        compiled = is_compiled()
+    if compiled:
+        if not is_compiled():
+            raise RuntimeError("the compiled kernel requires numba")
+        blocked = numpy.zeros(cells, dtype=numpy.int64)
+        for row, col in blocked_cells:
+            blocked[(row - 1) * cols + col - 1] = 1
+        counts = numpy.zeros(cells, dtype=numpy.int64)
+        _compiled(rows, cols, blocked, numpy.array(ships, dtype=numpy.int64), count, seed,
+                  PlacementGrid.MAX_PLACEMENT_ATTEMPTS, numpy.zeros(cells, dtype=numpy.int64), counts)
+        return [int(value) for value in counts]
+    blocked = [0] * cells
+    for row, col in blocked_cells:
+        blocked[(row - 1) * cols + col - 1] = 1
+    counts = [0] * cells
+    _sample(rows, cols, blocked, tuple(ships), count, seed,
+            PlacementGrid.MAX_PLACEMENT_ATTEMPTS, [0] * cells, counts)
+    return counts
+
+
+if __name__ == '__main__':  # pragma: no cover
+    logging.basicConfig(format=settings.DEFAULT_LOGGING_FORMAT, level=settings.DEFAULT_LOGGING_LEVEL)
+    logging.info("compiled kernel available: {0}".format(is_compiled()))
@@ -4,15 +4,15 @@
 Main entry point for the statistical analysis of Battleship algorithms.
 """
 
+import os
 import sys
 import time
+import random
 import argparse
 import logging
 
-import game
-import montecarlo
-import scilab
-import settings
+from battleship import game
+from battleship import settings
 
 __program__ = 'battleship'
 __version__ = '0.0.1'
@@ -25,19 +25,36 @@ def main():  # pragma: no cover
     parser = argparse.ArgumentParser(prog=__program__, description=__doc__)
     parser.add_argument('-r', '--random', action='store_true', help="randomly guessing algorithm")
     parser.add_argument('-m', '--montecarlo', metavar='N', type=split, help="Monte Carlo with given sample sizes")
+    parser.add_argument('-s', '--strategy', default='montecarlo', help="algorithm used to select each guess")
     parser.add_argument('repeat', type=int, default=1, nargs='?', help="number of times to repeat each simulation")
+    parser.add_argument('--seed', metavar='N', type=seed, help="seed each game from N for reproducible results")
     parser.add_argument('--graph', metavar='FILENAME', help="generate Scilab code to graph results")
+    parser.add_argument('--raw', action='store_true', help="graph every game instead of summary statistics")
+    parser.add_argument('--csv', metavar='FILENAME', help="write summary statistics to a CSV file")
+    parser.add_argument('--summary', action='store_true', help="display summary statistics when finished")
+    parser.add_argument('--progress', action='store_true', help="display throughput and estimated time remaining")
+    parser.add_argument('--metrics', metavar='FILENAME', help="append progress metrics to a JSON lines file")
     parser.add_argument('--sample', metavar='FILENAME', help="generate Scilab code to show sample game")
+    parser.add_argument('--sample-limit', metavar='N', type=int, help="show only the last N rounds of the sample game")
+    parser.add_argument('--sample-top', metavar='K', type=int, help="keep only the K highest frequencies per round")
+    parser.add_argument('--batch', action='store_true', help="play games in lockstep with batched sampling")
+    parser.add_argument('--record', metavar='FILENAME', help="save the board and shots of every game")
+    parser.add_argument('--replay', metavar='FILENAME', help="play against the boards of recorded games")
+    parser.add_argument('--split', metavar='QUEUE', help="add the sweep to a work queue instead of running it")
+    parser.add_argument('--work', metavar='QUEUE', help="play games from a work queue until it is empty")
+    parser.add_argument('--merge', metavar='QUEUE', help="report the combined results of a work queue")
+    parser.add_argument('--results', metavar='FILENAME', help="save the results of every game to a file")
+    parser.add_argument('--report', metavar='FILENAME', help="report saved results instead of running games")
     parser.add_argument('-v', '--version', action='version', version=__version__)
     parser.add_argument('-x', '--verbose', action='store_true', help="enable verbose logging")
     args = parser.parse_args()
-    if not any((args.random, args.montecarlo)):
+    if not any((args.random, args.montecarlo, args.work, args.merge, args.report)):
         parser.error("specify which algorithm to use")
 
     # Set logging level
     if args.verbose:
         logging.basicConfig(format=settings.VERBOSE_LOGGING_FORMAT, level=settings.VERBOSE_LOGGING_LEVEL)
-    elif args.graph or args.sample:
+    elif args.graph or args.sample or args.summary or args.progress:
         logging.basicConfig(format=settings.DEFAULT_LOGGING_FORMAT, level=settings.SPARSE_LOGGING_LEVEL)
     else:
         logging.basicConfig(format=settings.DEFAULT_LOGGING_FORMAT, level=settings.DEFAULT_LOGGING_LEVEL)
@@ -51,7 +68,20 @@ def main():  # pragma: no cover
 
     # Run program
     try:
-        if run(sample_sizes, args.repeat, args.graph, args.sample):
+        if args.report:
+            if report_saved(args.report, args.graph, args.csv, args.summary, raw=args.raw):
+                sys.exit(0)
+        elif args.split or args.work or args.merge:
+            if distribute(sample_sizes, args.repeat, args.split, args.work, args.merge, strategy=args.strategy,
+                          graph_path=args.graph, raw=args.raw, csv_path=args.csv, summary=args.summary,
+                          seed=0 if args.seed is None else args.seed):
+                sys.exit(0)
+        elif run(sample_sizes, args.repeat, args.graph, args.sample, strategy=args.strategy,
+                 record_path=args.record, replay_path=args.replay,
+                 raw=args.raw, csv_path=args.csv, summary=args.summary, batch=args.batch,
+                 sample_limit=args.sample_limit, sample_top=args.sample_top,
+                 progress=args.progress, metrics_path=args.metrics, results_path=args.results,
+                 seed=args.seed):
             sys.exit(0)
     except KeyboardInterrupt:
         logging.warning("user cancelled simulations")
@@ -68,87 +98,318 @@ def split(text):
     return [int(number) for number in text.split(',')]
 
 
-def run(sample_sizes, repetitions, graph_path=None, sample_path=None):
+def seed(text):
+    """Parse a random seed that can be stored with the results.
+
+    >>> seed("42")
+    42
+    """
+    from battleship.results import MAX_SEED
+
+    value = int(text)
+    if not 0 <= value <= MAX_SEED:
+        raise argparse.ArgumentTypeError("seed must be between 0 and {0}".format(MAX_SEED))
+    return value
+
+
+def is_strategy(name):
+    """Determine if a strategy is registered, logging the available strategies if not."""
+    from battleship.montecarlo import STRATEGIES
+
+    if name not in STRATEGIES:
+        logging.error("unknown strategy: {0} (choose from {1})".format(name, ', '.join(sorted(STRATEGIES))))
+        return False
+    return True
+
+
+def run(sample_sizes, repetitions, graph_path=None, sample_path=None, strategy='montecarlo',
+        record_path=None, replay_path=None, raw=False, csv_path=None, summary=False, batch=False,
+        sample_limit=None, sample_top=None, progress=False, metrics_path=None, results_path=None, seed=None):
     """Run simulations of a battleship game using the desired options.
 
     @param sample_sizes: list of sample sizes the Monte Carlo algorithm (size 0 represents random guessing)
-    @param repetitions: number of times to run each algorithm
+    @param repetitions: number of times to run each algorithm (on each recorded board when replaying)
     @param graph_path: path to write Scilab graph code
     @param sample_path: path to write Scilab sample game code
+    @param strategy: name of the registered strategy used to select guesses
+    @param record_path: path to write a record of every game
+    @param replay_path: path of recorded games whose boards are played instead of random boards
+    @param raw: graph the results of every game instead of summary statistics
+    @param csv_path: path to write summary statistics as CSV
+    @param summary: display a table of summary statistics when finished
+    @param batch: play each sample size's games in lockstep with batched Monte Carlo sampling
+    @param sample_limit: maximum number of rounds to keep for the sample game
+    @param sample_top: number of highest frequencies to keep for each round of the sample game
+    @param progress: display throughput and estimated time remaining (always shown when graphing)
+    @param metrics_path: path to append progress metrics as JSON lines
+    @param results_path: path to save the results of every game
+    @param seed: random seed of the first game for each sample size (the next games use the following seeds)
     @return: indication that simulations completed successfully
     """
-    results = {}
+    from battleship.results import Results, MAX_SEED
+
+    if not is_strategy(strategy):
+        return False
+    results = Results()
     if sample_path:
         if len(sample_sizes) > 1:
             logging.error("specify only one sample size to generate a sample game")
             return False
-        frequency_log = []
+        from battleship.montecarlo import FrequencyLog
+        frequency_log = FrequencyLog(sample_limit, sample_top)
     else:
         frequency_log = None
+    if batch:
+        from battleship.batch import supports
+        if sample_path or not supports(strategy):
+            logging.error("batch mode requires a Monte Carlo strategy and no sample game")
+            return False
+        if seed is not None:
+            logging.error("batch mode interleaves games, so they cannot be seeded individually")
+            return False
+
+    # Load recorded boards to replay
+    boards = [None]
+    if replay_path:
+        from battleship import record
+        try:
+            boards = record.load(replay_path)
+        except (IOError, ValueError) as exception:
+            logging.error(exception)
+            return False
+        if not boards:
+            logging.error("no games recorded in {0}".format(replay_path))
+            return False
+    if seed is not None and not 0 <= seed <= MAX_SEED - repetitions * len(boards) + 1:
+        logging.error("seeds must be between 0 and {0}".format(MAX_SEED))
+        return False
+    recorder = None
+    if record_path:
+        from battleship import record
+        recorder = record.Writer(record_path)
+
+    # Report progress periodically
+    reporter = None
+    if progress or graph_path or metrics_path:
+        from battleship.progress import Progress
+        reporter = Progress(len(sample_sizes) * repetitions * len(boards), metrics_path=metrics_path,
+                            display=bool(progress or graph_path))
 
     # Run simulations for each sample size
-    for index, sample_size in enumerate(sample_sizes):
+    try:
+        for index, sample_size in enumerate(sample_sizes):
+
+            # Repeat each simulation a number of times
+            logging.info("running algorithm sample size {0} of {1}...".format(index + 1, len(sample_sizes)))
+            count = repetitions * len(boards)
+            if batch:
+                from battleship.batch import simulate
+                placements = [board.get_placement_grid() for board in boards] if replay_path else None
+                games = ((guesses, steps, duration, None, None) for guesses, steps, duration
+                         in simulate(sample_size, count, strategy=strategy, boards=placements, recorder=recorder))
+            else:
+                games = _simulations(sample_size, count, boards, frequency_log, strategy, recorder, seed)
+            for guesses, steps, duration, timings, game_seed in games:
+
+                # Log results
+                results.add(sample_size, guesses, steps, duration, strategy=strategy, seed=game_seed,
+                            timings=timings)
+
+                # Show progress
+                if reporter:
+                    reporter.update(sample_size, guesses, steps, duration)
+    finally:
+        if recorder:
+            recorder.close()
+        if reporter:
+            reporter.close()
 
-        results[sample_size] = []
+    # Generate Scilab code
+    if sample_path:
+        from battleship import scilab
+        if not scilab.write_sample(frequency_log, sample_path):  # pragma: no cover
+            return False
+
+    # Save results
+    if results_path:
+        if not results.save(results_path):  # pragma: no cover
+            return False
 
-        # Repeat each simulation a number of times
-        logging.info("running algorithm sample size {0} of {1}...".format(index + 1, len(sample_sizes)))
-        for index2 in range(repetitions):
+    return report(results, graph_path, csv_path, summary, raw=raw)
 
-            # Run simulation and log results
-            logging.info("running simulation {0} of {1}...".format(index2 + 1, repetitions))
-            guesses, steps, duration = simulation(sample_size, frequency_log=frequency_log)
-            results[sample_size].append((guesses, steps, duration))
 
-            # Show only basic progress when generating Scilab data
-            if graph_path:
-                sys.stderr.write('.')
-                sys.stderr.flush()
+def distribute(sample_sizes, repetitions, split_path=None, work_path=None, merge_path=None, strategy='montecarlo',
+               graph_path=None, raw=False, csv_path=None, summary=False, seed=0):
+    """Split a sweep into a work queue, play games from it, or report its results.
+
+    @param sample_sizes: list of sample sizes the Monte Carlo algorithm (size 0 represents random guessing)
+    @param repetitions: number of times to run each algorithm
+    @param split_path: queue directory to add the sweep to
+    @param work_path: queue directory to play games from
+    @param merge_path: queue directory to combine results from
+    @param strategy: name of the registered strategy used to select guesses
+    @param graph_path: path to write Scilab graph code of the merged results
+    @param raw: graph the results of every game instead of summary statistics
+    @param csv_path: path to write summary statistics as CSV
+    @param summary: display a table of summary statistics when finished
+    @param seed: random seed of the first game for each sample size when splitting
+    @return: indication that the queue operations completed successfully
+    """
+    from battleship import sweep
+    from battleship.results import MAX_SEED
+
+    if split_path:
+        if not is_strategy(strategy):
+            return False
+        if not 0 <= seed <= MAX_SEED - repetitions + 1:
+            logging.error("seeds must be between 0 and {0}".format(MAX_SEED))
+            return False
+        sweep.split(split_path, sample_sizes, repetitions, seed=seed, strategy=strategy)
+    if work_path:
+        sweep.work(work_path)
+    if merge_path:
+        results = sweep.merge(merge_path)
+        if not results:
+            logging.error("no completed results in {0}".format(merge_path))
+            return False
+        return report(results, graph_path, csv_path, summary, raw=raw)
+    return True
+
+
+def report(results, graph_path=None, csv_path=None, summary=False, raw=False):
+    """Generate reports of simulation results.
+
+    Results of several strategies are summarized by strategy and sample size,
+    and a Scilab graph is written for each strategy (named after graph_path).
+
+    @param results: results.Results of every game
+    @param graph_path: path to write Scilab graph code
+    @param csv_path: path to write summary statistics as CSV
+    @param summary: display a table of summary statistics
+    @param raw: graph the results of every game instead of summary statistics
+    @return: indication that reports were generated successfully
+    """
+    from battleship import stats
+    from battleship.results import PHASES
+
+    grouped = len(set(results.columns['strategy'])) > 1
+    aggregates = results.summarize('strategy', 'sample_size') if grouped else results.summarize('sample_size')
 
     # Generate Scilab code
     if graph_path:
-        sys.stderr.write('\n')
-        if not scilab.write_graph(results, graph_path):  # pragma: no cover
-            return False
-    if sample_path:
-        if not scilab.write_sample(frequency_log, sample_path):  # pragma: no cover
+        from battleship import scilab
+        groups = results.group_by('strategy') if grouped else {None: results}
+        for strategy, group in sorted(groups.items()):
+            path = graph_path if strategy is None else get_strategy_path(graph_path, strategy)
+            if raw:
+                if not scilab.write_graph(group.get_games(), path):  # pragma: no cover
+                    return False
+            elif not scilab.write_summary(group.summarize('sample_size'), path):  # pragma: no cover
+                return False
+
+    # Report summary statistics
+    if csv_path:
+        if not stats.write_csv(aggregates, csv_path):  # pragma: no cover
             return False
+    if summary:
+        sys.stdout.write(stats.format_summary(aggregates) + '\n')
+        for phase in PHASES:
+            seconds = results.mean(phase + '_duration')
+            if seconds is not None:
+                sys.stdout.write("{0} phase: {1:.4f} seconds per game\n".format(phase, seconds))
 
     return True
 
 
-def simulation(samples, frequency_log=None):
+def get_strategy_path(path, strategy):
+    """Return the path of a report for a single strategy.
+
+    >>> get_strategy_path('graph.sce', 'parity')
+    'graph-parity.sce'
+    """
+    root, extension = os.path.splitext(path)
+    return "{0}-{1}{2}".format(root, strategy, extension)
+
+
+def report_saved(results_path, graph_path=None, csv_path=None, summary=False, raw=False):
+    """Generate reports of results saved to a file (see report).
+
+    @param results_path: path of the saved results
+    @return: indication that reports were generated successfully
+    """
+    from battleship import results
+
+    try:
+        saved = results.load(results_path)
+    except (IOError, ValueError) as exception:
+        logging.error(exception)
+        return False
+    return report(saved, graph_path, csv_path, summary, raw=raw)
+
+
+def _simulations(samples, count, boards, frequency_log, strategy, recorder, seed=None):
+    """Generate the results of several simulations played one at a time (with their timings and seeds)."""
+    for index in range(count):
+        logging.info("running simulation {0} of {1}...".format(index + 1, count))
+        board = boards[index % len(boards)]
+        placements = board.get_placement_grid() if board else None
+        game_seed = None if seed is None else seed + index
+        if game_seed is not None:
+            random.seed(game_seed)
+        timings = {}
+        yield simulation(samples, frequency_log=frequency_log, strategy=strategy,
+                         placements=placements, recorder=recorder, timings=timings) + (timings, game_seed)
+
+
+def simulation(samples, frequency_log=None, strategy='montecarlo', placements=None, recorder=None, timings=None):
     """Run a simulation of a battleship game using the desired options.
 
     @param samples: number of samples for the Monte Carlo algorithm, 0 for random guessing
     @param frequency_log: object to log frequency data for each simulation
+    @param strategy: name of the registered strategy used to select guesses
+    @param placements: PlacementGrid to play against (default: a new random playing field)
+    @param recorder: record.Writer to save the board and shots of the game
+    @param timings: dictionary to receive the seconds spent in each phase of the player's algorithm
     @return: number of guesses required to win the game, number of algorithm steps, duration in seconds
     """
+    from battleship import montecarlo
+
     start = time.time()
-    counter = scilab.StepCounter()
+    counter = game.StepCounter()
 
     # Create a random playing field
-    placements = game.PlacementGrid()
-    placements.initialize()
+    if placements is None:
+        placements = game.PlacementGrid()
+        placements.initialize()
 
     # Create a grid to store guesses
     shots = game.ShotsGrid()
 
     # Create a computer player
-    player = montecarlo.Player(samples)
+    player = montecarlo.get_strategy(strategy, samples)
 
     # Run game simulation
+    cells = []
     while not shots.is_won():
         row, col = player.get_guess(shots, counter, frequency_log=frequency_log)
         if frequency_log:
             frequency_log[-1].set_guessed_cells(shots.get_guessed_cells())
             frequency_log[-1].set_hit_cells(shots.get_hit_cells())
-        shots.guess(row, col, placements)
+        hit = shots.guess(row, col, placements)
+        player.observe(row, col, hit)
+        cells.append((row, col))
+    duration = time.time() - start
+
+    # Record the game
+    if timings is not None:
+        timings.update(player.timings)
+    if recorder:
+        recorder.write(samples, placements, cells)
 
     # Return number of guesses required
     guesses = len(shots.get_guessed_cells())
     logging.info("the game was won after {0} guesses".format(guesses))
-    return guesses, counter.value(), time.time() - start
+    return guesses, counter.value(), duration
 
 
 if __name__ == '__main__':  # pragma: no cover
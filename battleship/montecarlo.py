@@ -4,14 +4,121 @@
 Implementation of a Monte Carlo algorithm to select the next most likely hit in a Battleship game.
 """
 
+import time
 import random
 import logging
+from array import array
+from collections import deque
 
-from game import Grid, PlacementGrid
-import settings
+from battleship.game import Grid, PlacementGrid
+from battleship import settings
 
+KERNEL_CHUNK = 100  # samples per kernel call when sampling against a deadline
+EXACT_THRESHOLD = 20000  # largest state space the exact strategy enumerates instead of sampling
 
-class Player(object):
+
+STRATEGIES = {}
+
+
+def register(name):
+    """Class decorator to add a strategy to the registry.
+
+    @param name: name used to select the strategy
+    @return: decorator that registers the class
+    """
+    def decorator(cls):
+        """Register the strategy class under the given name."""
+        cls.name = name
+        STRATEGIES[name] = cls
+        return cls
+    return decorator
+
+
+def get_strategy(name, sample_size=0):
+    """Create a new strategy from the registry.
+
+    @param name: registered name of the strategy
+    @param sample_size: number of steps in the Monte Carlo method
+    @return: new strategy instance
+    """
+    try:
+        cls = STRATEGIES[name]
+    except KeyError:
+        raise ValueError("unknown strategy: {0}".format(name))
+    return cls(sample_size)
+
+
+class Strategy(object):
+    """Base class for algorithms that select the next cell to guess.
+
+    A new strategy is created for each game, so implementations may keep per-game
+    state and update it in observe() rather than recomputing it from the shots grid.
+    """
+
+    name = None
+
+    def __init__(self, sample_size=0):
+        """Create new computer player.
+
+        @param sample_size: number of steps in the Monte Carlo method, 0 for purely random guessing
+        """
+        self.sample_size = sample_size
+        self.timings = {}  # seconds spent in each phase of selecting guesses: {phase: seconds}
+
+    def get_guess(self, shots, counter, frequency_log=None, time_limit=None):
+        """Return next cell to guess.
+
+        @param shots: ShotsGrid of shots already taken
+        @param counter: StepCounter to increment for each algorithm step
+        @param frequency_log: list to append FrequencyGrid data for each guess
+        @param time_limit: maximum number of seconds to spend selecting a cell
+        @return: next cell to guess
+        """
+        raise NotImplementedError  # pragma: no cover, implemented by each strategy
+
+    def observe(self, row, col, hit):
+        """Receive the result of a guess.
+
+        @param row: 1-indexed row that was guessed
+        @param col: 1-indexed column that was guessed
+        @param hit: indicates a ship was hit
+        """
+        pass
+
+
+@register('naive')
+class NaivePlayer(Strategy):
+    """Computer player guessing unguessed cells at random without targeting."""
+
+    def __init__(self, sample_size=0):
+        super(NaivePlayer, self).__init__(sample_size)
+        self.unguessed_cells = None  # remaining choices, in any order
+        self.indices = None  # position of each remaining choice: {cell: index}
+
+    def get_guess(self, shots, counter, frequency_log=None, time_limit=None):
+        """Return a random unguessed cell."""
+        if self.unguessed_cells is None:
+            self.unguessed_cells = shots.get_unguessed_cells()
+            self.indices = dict((cell, index) for index, cell in enumerate(self.unguessed_cells))
+        counter.increment()
+        return random.choice(self.unguessed_cells)
+
+    def observe(self, row, col, hit):
+        """Remove the guessed cell from the remaining choices."""
+        if self.unguessed_cells is None:
+            return
+        index = self.indices.pop((row, col), None)
+        if index is None:
+            return
+        # Move the last choice into the guessed cell's place so removal takes constant time
+        last = self.unguessed_cells.pop()
+        if index < len(self.unguessed_cells):
+            self.unguessed_cells[index] = last
+            self.indices[last] = index
+
+
+@register('montecarlo')
+class Player(Strategy):
     """Computer player utilizing Monte Carlo sampling to select each play.
 
     The algorithm:
@@ -20,28 +127,44 @@ class Player(object):
     3. randomly select from the cells most likely to contain part of a ship
 
     If the sample size is 0, no Monte Carlo sampling will occur and randomly guessing will be applied.
+
+    When a time limit is given, sampling stops at the deadline (or after N samples)
+    and the best cell found so far is selected. The number of samples achieved for
+    the last guess is stored in the 'samples' attribute.
+
+    Subclasses change how the frequencies are estimated by overriding
+    accumulate(), and which cells are considered by overriding
+    get_target_cells() and get_candidate_cells().
     """
 
     def __init__(self, sample_size=0):
-        """Create new computer player.
-
-        @param sample_size: number of steps in the Monte Carlo method, 0 for purely random guessing
-        """
-        self.sample_size = sample_size
+        super(Player, self).__init__(sample_size)
+        self.samples = 0
+        self.effective_samples = 0
 
-    def get_guess(self, shots, counter, frequency_log=None):
+    def get_guess(self, shots, counter, frequency_log=None, time_limit=None):
         """Return next cell to guess based on targeting (if applicable) or using Monte Carlo sampling.
 
         @param shots: ShotsGrid of shots already taken
+        @param time_limit: maximum number of seconds to spend sampling
         @return: next cell to guess
         """
+        start = time.time()
+
         # Target cells surrounding hits first
-        target_cells = shots.get_target_cells()
+        target_cells = self.get_target_cells(shots)
         if target_cells:
-            return self.get_random_guess(shots, target_cells, counter, frequency_log=frequency_log)
+            self.samples = 0
+            phase = 'target'
+            guess = self.get_random_guess(shots, target_cells, counter, frequency_log=frequency_log)
 
         # Use Monte Carlo sampling to select the best cell
-        return self.get_monte_carlo_guess(shots, counter, frequency_log=frequency_log)
+        else:
+            phase = 'sample'
+            guess = self.get_monte_carlo_guess(shots, counter, frequency_log=frequency_log, time_limit=time_limit)
+
+        self.timings[phase] = self.timings.get(phase, 0.0) + time.time() - start
+        return guess
 
     def get_random_guess(self, shots, target_cells, counter, frequency_log=None):
         """Return next cell to guess from the available target cells.
@@ -60,39 +183,318 @@ class Player(object):
         counter.increment()
         return random.choice(target_cells)
 
-    def get_monte_carlo_guess(self, shots, counter, frequency_log=None):
+    def get_monte_carlo_guess(self, shots, counter, frequency_log=None, time_limit=None):
         """Return next cell to guess based on Monte Carlo sampling.
 
         @param shots: ShotsGrid of shots already taken
+        @param time_limit: maximum number of seconds to spend sampling
         @return: next best cell to guess
         """
+        deadline = None if time_limit is None else time.time() + time_limit
         # Create grid to store frequency totals for all samples
         frequencies = FrequencyGrid()
-        frequencies.set_guessed_cells(shots.get_guessed_cells())
+        guessed_cells = shots.get_guessed_cells()
+        frequencies.set_guessed_cells(guessed_cells)
         # Guess which ships could be remaining
         ships = shots.get_remaining_ships()
         logging.info("estimated remaining ships: {0}".format(ships))
+        # Limit candidates to the parity lattice of the smallest remaining ship
+        candidate_cells = self.get_candidate_cells(shots, ships)
         # Create placement samples
+        self.samples = 0
+        total, total_squares = self.accumulate(frequencies, guessed_cells, ships, candidate_cells, counter,
+                                               deadline)
+        self.effective_samples = float(total * total) / total_squares if total_squares else 0
+        logging.info("effective sample size: {0:.1f} of {1}".format(self.effective_samples, self.samples))
+        logging.info("frequencies after sampling:\n{0}".format(frequencies))
+        if frequency_log is not None:
+            frequency_log.append(frequencies)
+        # Select the best cell using the measured frequencies
+        best_cells = frequencies.get_best_cells(candidate_cells)
+        logging.debug("selecting from best probability cells: {0}".format(best_cells))
+        return random.choice(best_cells)
+
+    def accumulate(self, frequencies, guessed_cells, ships, candidate_cells, counter, deadline=None):
+        """Add the ship cells of random placements to the frequencies.
+
+        @param frequencies: FrequencyGrid to update
+        @param guessed_cells: list of cells already guessed
+        @param ships: lengths of the remaining ships
+        @param candidate_cells: list of cells to update
+        @param counter: StepCounter to increment for each sample
+        @param deadline: time to stop sampling
+        @return: sum and sum of squares of the sample weights
+        """
+        def place(placements):
+            """Place the remaining ships uniformly at random."""
+            placements.sample(ships)
+            return 1
+
+        return self.sample_placements(frequencies, guessed_cells, candidate_cells, counter, deadline, place)
+
+    def sample_placements(self, frequencies, guessed_cells, candidate_cells, counter, deadline, place):
+        """Add the ship cells of placements created by a function to the frequencies.
+
+        @param place: function to place the remaining ships on a PlacementGrid, returning the sample's weight
+        @return: sum and sum of squares of the sample weights
+        """
+        total = total_squares = 0
         for sample in range(self.sample_size):
-            logging.info("computing Monte Carlo sample {0} of {1}...".format(sample + 1, self.sample_size))
+            if deadline is not None and time.time() >= deadline:
+                logging.info("time limit reached after {0} samples".format(sample))
+                break
+            # formatting is deferred as this is logged for every sample
+            logging.debug("computing Monte Carlo sample %s of %s...", sample + 1, self.sample_size)
             counter.increment()
+            self.samples += 1
             placements = PlacementGrid()
             # Mark already guessed cells
-            for row, col in shots.get_guessed_cells():
+            for row, col in guessed_cells:
                 placements.set_cell(row, col, PlacementGrid.SKIP)
             # Randomly place remaining ships
-            placements.sample(ships)
+            weight = place(placements)
+            total += weight
+            total_squares += weight * weight
+            if not weight:
+                continue
             # Update frequencies
-            for (row, col), value in placements:
-                if value == PlacementGrid.PLACEMENT:
-                    frequencies.increment(row, col)
-        logging.info("frequencies after sampling:\n{0}".format(frequencies))
-        if frequency_log is not None:
-            frequency_log.append(frequencies)
-        # Select the best cell using the measured frequencies
-        best_cells = frequencies.get_best_cells()
-        logging.debug("selecting from best probability cells: {0}".format(best_cells))
-        return random.choice(best_cells)
+            for row, col in candidate_cells:
+                if placements.get_cell(row, col) == PlacementGrid.PLACEMENT:
+                    frequencies.increment(row, col, weight)
+        return total, total_squares
+
+    def get_target_cells(self, shots):
+        """Return the unguessed cells to target around hits.
+
+        @param shots: ShotsGrid of shots already taken
+        @return: list of cells to target (empty when hunting)
+        """
+        return shots.get_target_cells()
+
+    @staticmethod
+    def get_positions(guessed_cells, ships):
+        """Return the positions of each remaining ship that avoid guessed cells.
+
+        @param guessed_cells: list of cells already guessed
+        @param ships: lengths of the remaining ships
+        @return: dictionary of positions for each ship length
+        """
+        placements = PlacementGrid()
+        for row, col in guessed_cells:
+            placements.set_cell(row, col, PlacementGrid.SKIP)
+        return dict((length, placements.get_positions(length)) for length in set(ships))
+
+    def get_candidate_cells(self, shots, ships):
+        """Return the unguessed cells that could be selected by Monte Carlo sampling.
+
+        @param shots: ShotsGrid of shots already taken
+        @param ships: lengths of the remaining ships
+        @return: list of cells to consider
+        """
+        return shots.get_unguessed_cells()
+
+
+@register('parity')
+class ParityPlayer(Player):
+    """Computer player restricting its hunt to a checkerboard parity lattice.
+
+    Every ship of length L crosses a cell where (row + col) % L == 0, so while
+    hunting only those cells need to be sampled and guessed. The lattice becomes
+    sparser as the smallest remaining ship grows.
+    """
+
+    def get_candidate_cells(self, shots, ships):
+        """Return the unguessed cells on the parity lattice (or all unguessed cells if none remain)."""
+        parity_cells = shots.get_parity_cells(min(ships))
+        if parity_cells:
+            return parity_cells
+        return super(ParityPlayer, self).get_candidate_cells(shots, ships)
+
+
+@register('line')
+class LinePlayer(Player):
+    """Computer player extending lines of hits while targeting.
+
+    Once two or more hits are adjacent, only the unguessed cells at the ends of
+    the line are targeted, since the ship most likely continues in that direction.
+    """
+
+    def get_target_cells(self, shots):
+        """Return the unguessed cells extending lines of hits."""
+        return shots.get_target_cells(line=True)
+
+
+@register('weighted')
+class WeightedPlayer(Player):
+    """Computer player sampling fleet configurations with importance weights.
+
+    Each sample places the remaining ships in a random order among all of their
+    free positions and is weighted so the frequency map estimates the uniform
+    distribution over fleet configurations. The effective sample size of the
+    last guess is stored in the 'effective_samples' attribute.
+    """
+
+    def accumulate(self, frequencies, guessed_cells, ships, candidate_cells, counter, deadline=None):
+        """Add the ship cells of weighted placements to the frequencies."""
+        positions = self.get_positions(guessed_cells, ships)
+
+        def place(placements):
+            """Place the remaining ships in a random order, returning the importance weight."""
+            return placements.sample_weighted(ships, positions)
+
+        return self.sample_placements(frequencies, guessed_cells, candidate_cells, counter, deadline, place)
+
+
+@register('kernel')
+class KernelPlayer(Player):
+    """Computer player sampling with the placement kernel.
+
+    The kernel is compiled with Numba when it is installed and otherwise runs
+    as Python, with identical results for the same seed.
+    """
+
+    def accumulate(self, frequencies, guessed_cells, ships, candidate_cells, counter, deadline=None):
+        """Add the ship cells of placements from the sampling kernel to the frequencies.
+
+        The deadline is checked between chunks of samples.
+        """
+        from battleship import kernel
+
+        chunk = self.sample_size if deadline is None else KERNEL_CHUNK
+        while self.samples < self.sample_size:
+            if deadline is not None and time.time() >= deadline:
+                logging.info("time limit reached after {0} samples".format(self.samples))
+                break
+            count = min(chunk, self.sample_size - self.samples)
+            counts = kernel.sample_counts(frequencies.rows, frequencies.cols, guessed_cells, ships, count,
+                                          seed=random.getrandbits(32))
+            for _ in range(count):
+                counter.increment()
+            self.samples += count
+            for row, col in candidate_cells:
+                frequencies.increment(row, col, counts[(row - 1) * frequencies.cols + col - 1])
+        return self.samples, self.samples
+
+
+@register('exact')
+class ExactPlayer(Player):
+    """Computer player enumerating every fleet configuration in the endgame.
+
+    Once the remaining ships have few enough free positions (see EXACT_THRESHOLD),
+    every fleet configuration is counted instead of sampled, giving exact
+    frequencies. Larger state spaces are sampled as usual.
+    """
+
+    exact_threshold = EXACT_THRESHOLD
+
+    def accumulate(self, frequencies, guessed_cells, ships, candidate_cells, counter, deadline=None):
+        """Add the ship cells of every fleet configuration to the frequencies, or sample if there are too many."""
+        exact = None
+        if self.sample_size:
+            exact = enumerate_counts(frequencies.rows, frequencies.cols, guessed_cells, ships,
+                                     self.exact_threshold, counter)
+        if not exact:
+            return super(ExactPlayer, self).accumulate(frequencies, guessed_cells, ships, candidate_cells, counter,
+                                                       deadline)
+        counts, total = exact
+        logging.info("enumerated {0} fleet configurations".format(total))
+        for row, col in candidate_cells:
+            frequencies.increment(row, col, counts.get((row, col), 0))
+        return total, total
+
+
+def count_positions(rows, cols, guessed_cells, lengths):
+    """Count the free positions of each ship length from the runs of free cells.
+
+    @param rows: number of rows on the grid
+    @param cols: number of columns on the grid
+    @param guessed_cells: list of cells that cannot contain a ship
+    @param lengths: ship lengths to count
+    @return: dictionary of the number of positions for each length
+    """
+    blocked = set(guessed_cells)
+
+    def get_runs(lines):
+        """Return the lengths of the consecutive free cells in each line."""
+        runs = []
+        for line in lines:
+            run = 0
+            for cell in line:
+                if cell in blocked:
+                    runs.append(run)
+                    run = 0
+                else:
+                    run += 1
+            runs.append(run)
+        return runs
+
+    horizontal = get_runs([(row, col) for col in range(1, cols + 1)] for row in range(1, rows + 1))
+    vertical = get_runs([(row, col) for row in range(1, rows + 1)] for col in range(1, cols + 1))
+    counts = {}
+    for length in set(lengths):
+        runs = horizontal + vertical if length > 1 else horizontal
+        counts[length] = sum(run - length + 1 for run in runs if run >= length)
+    return counts
+
+
+def enumerate_counts(rows, cols, guessed_cells, ships, threshold=EXACT_THRESHOLD, counter=None):
+    """Count the fleet configurations occupying each cell by exhaustive enumeration.
+
+    The state space is measured from the runs of free cells, so large ones are
+    rejected before any positions are built. Ships of equal length are
+    interchangeable, so each combination of their positions is only
+    enumerated once.
+
+    @param rows: number of rows on the grid
+    @param cols: number of columns on the grid
+    @param guessed_cells: list of cells that cannot contain a ship
+    @param ships: lengths of the remaining ships
+    @param threshold: largest state space (product of the positions of each ship) to enumerate
+    @param counter: StepCounter to increment for each ship placed
+    @return: dictionary of counts for each cell and the number of configurations,
+             or None if the state space is too large or no configuration fits
+    """
+    lengths = sorted(ships, reverse=True)
+    sizes = count_positions(rows, cols, guessed_cells, lengths)
+    size = 1
+    for length in lengths:
+        size *= sizes[length]
+        if not size or size > threshold:
+            return None
+    placements = PlacementGrid(rows, cols)
+    for row, col in guessed_cells:
+        placements.set_cell(row, col, PlacementGrid.SKIP)
+    positions = dict((length, placements.get_positions(length)) for length in set(lengths))
+    counts = {}
+    occupied = set()
+    chosen = []
+    configurations = [0]
+
+    def place(index, start):
+        """Place the ship at the index in every free position, then the remaining ships."""
+        if index == len(lengths):
+            configurations[0] += 1
+            for position in chosen:
+                for cell in position:
+                    counts[cell] = counts.get(cell, 0) + 1
+            return
+        options = positions[lengths[index]]
+        first = start if index and lengths[index - 1] == lengths[index] else 0
+        for option in range(first, len(options)):
+            position = options[option]
+            if occupied.isdisjoint(position):
+                if counter:
+                    counter.increment()
+                occupied.update(position)
+                chosen.append(position)
+                place(index + 1, option + 1)
+                chosen.pop()
+                occupied.difference_update(position)
+
+    place(0, 0)
+    if not configurations[0]:
+        return None
+    return counts, configurations[0]
 
 
 class FrequencyGrid(Grid):
@@ -114,17 +516,114 @@ class FrequencyGrid(Grid):
         for row, col in cells:
             self.set_cell(row, col, self.HIT)
 
-    def increment(self, row, col):
+    def increment(self, row, col, amount=1):
         """Increment frequency at the specified cell."""
-        self.set_cell(row, col, self.get_cell(row, col) + 1)
+        self.set_cell(row, col, self.get_cell(row, col) + amount)
+
+    def get_best_cells(self, cells=None):
+        """Return of list of cells with the highest probability.
 
-    def get_best_cells(self):
-        """Return of list of cells with the highest probability."""
+        @param cells: limit the search to these cells (all cells by default)
+        """
+        if cells is None:
+            cells = [cell for cell, _value in self]
         # Find highest probability
-        best = max((value for _cell, value in self))
+        best = max(self.get_cell(row, col) for row, col in cells)
         logging.info("current highest frequency: {0}".format(best))
         # Find cells with the highest probability
-        return [cell for cell, value in self if value >= best]
+        return [(row, col) for row, col in cells if self.get_cell(row, col) >= best]
+
+
+class FrequencyLog(object):
+    """Memory-bounded list of the FrequencyGrid for each guess of a game.
+
+    Only the latest grid is kept in full so it can still be updated after the
+    guess is made. Earlier grids are stored compactly: guessed and hit cells as
+    bitmasks of cell indices and frequencies as a flat array, optionally reduced
+    to the highest frequencies. Optionally only the most recent rounds are kept.
+    Full grids are reconstructed when iterating.
+    """
+
+    def __init__(self, limit=None, top=None):
+        """Create an empty log.
+
+        @param limit: maximum number of rounds to keep (oldest are discarded)
+        @param top: number of highest frequencies to keep for each earlier round
+        """
+        if limit is not None and limit < 1:
+            raise ValueError("log must keep at least one round")
+        self.top = top
+        self.rounds = deque(maxlen=None if limit is None else limit - 1)
+        self.current = None
+
+    def __len__(self):
+        return len(self.rounds) + (self.current is not None)
+
+    def __iter__(self):
+        """Iterate through full grids for each round."""
+        for compressed in self.rounds:
+            yield self.expand(compressed)
+        if self.current is not None:
+            yield self.current
+
+    def __getitem__(self, index):
+        if index in (-1, len(self) - 1) and self.current is not None:
+            return self.current
+        return list(self)[index]
+
+    def append(self, grid):
+        """Add the grid for the next round."""
+        if self.current is not None:
+            self.rounds.append(self.compress(self.current))
+        self.current = grid
+
+    def compress(self, grid):
+        """Convert a grid to its compact representation.
+
+        @return: rows, cols, guessed bitmask, hit bitmask, cell indices of the
+                 frequencies (None when every cell is stored), and frequencies
+        """
+        guessed = hits = 0
+        frequencies = []
+        for index, (_cell, value) in enumerate(grid):
+            if value == FrequencyGrid.GUESSED:
+                guessed |= 1 << index
+            elif value == FrequencyGrid.HIT:
+                hits |= 1 << index
+            frequencies.append(max(value, 0))
+        if self.top is None:
+            return grid.rows, grid.cols, guessed, hits, None, self.pack(frequencies)
+        ranked = sorted(((value, index) for index, value in enumerate(frequencies) if value),
+                        key=lambda item: item[0], reverse=True)[:self.top]
+        return (grid.rows, grid.cols, guessed, hits,
+                array('H', [index for _value, index in ranked]), self.pack([value for value, _index in ranked]))
+
+    @staticmethod
+    def pack(values):
+        """Store frequencies as 32-bit integers, or as doubles if any do not fit."""
+        try:
+            return array('i', values)
+        except (OverflowError, TypeError):
+            return array('d', values)
+
+    @staticmethod
+    def expand(compressed):
+        """Convert a compact representation back to a grid."""
+        rows, cols, guessed, hits, indices, values = compressed
+        grid = FrequencyGrid(rows, cols)
+        if values.typecode == 'd':
+            values = [int(value) if value.is_integer() else value for value in values]
+        for index, value in zip(range(rows * cols) if indices is None else indices, values):
+            if value:
+                grid.set_cell(index // cols + 1, index % cols + 1, value)
+        for mask, marker in ((guessed, FrequencyGrid.GUESSED), (hits, FrequencyGrid.HIT)):
+            index = 0
+            while mask:
+                if mask & 1:
+                    grid.set_cell(index // cols + 1, index % cols + 1, marker)
+                mask >>= 1
+                index += 1
+        return grid
 
 
 if __name__ == '__main__':  # pragma: no cover
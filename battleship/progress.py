@@ -0,0 +1,113 @@
+#!/usr/bin/env python
+
+"""
+Low-overhead progress reporting for long simulation sweeps.
+
+Results are counted as they arrive, but the display (and the optional metrics
+file) is only updated at a fixed interval, so reporting cost does not grow
+with the number of games.
+"""
+
+import sys
+import json
+import time
+import logging
+
+from battleship import settings
+
+DEFAULT_INTERVAL = 1.0  # seconds between updates
+
+
+class Progress(object):
+    """Tracks completed games and periodically reports throughput and ETA."""
+
+    def __init__(self, total, interval=DEFAULT_INTERVAL, stream=None, metrics_path=None, clock=time.time,
+                 display=True):
+        """Create a new progress reporter.
+
+        @param total: number of games expected
+        @param interval: minimum number of seconds between reports
+        @param stream: file to display progress on (default: stderr)
+        @param metrics_path: file to append a JSON line of metrics to on each report
+        @param clock: function returning the current time in seconds
+        @param display: show progress on the stream (otherwise only metrics are written)
+        """
+        self.total = total
+        self.interval = interval
+        self.stream = sys.stderr if stream is None else stream
+        self.display = display
+        self.metrics_path = metrics_path
+        self.clock = clock
+        self.start = self.last = clock()
+        self.games = 0
+        self.steps = 0
+        self.guesses = {}  # sample size: [games, total guesses]
+
+    def update(self, sample_size, guesses, steps, _duration=None):
+        """Count a completed game and report if the interval has passed."""
+        self.games += 1
+        self.steps += steps
+        totals = self.guesses.get(sample_size)
+        if totals is None:
+            totals = self.guesses[sample_size] = [0, 0]
+        totals[0] += 1
+        totals[1] += guesses
+        now = self.clock()
+        if now - self.last >= self.interval:
+            self.report(now)
+
+    def get_metrics(self, now=None):
+        """Return a dictionary of the current progress metrics."""
+        now = self.clock() if now is None else now
+        elapsed = now - self.start
+        rate = self.games / elapsed if elapsed > 0 else 0.0
+        remaining = self.total - self.games
+        return {'time': now,
+                'elapsed': elapsed,
+                'games': self.games,
+                'total': self.total,
+                'games_per_second': rate,
+                'steps_per_second': self.steps / elapsed if elapsed > 0 else 0.0,
+                'eta': remaining / rate if rate else None,
+                'mean_guesses': dict((str(sample_size), float(total) / count)
+                                     for sample_size, (count, total) in self.guesses.items())}
+
+    def report(self, now=None):
+        """Display the current progress and append it to the metrics file."""
+        metrics = self.get_metrics(now)
+        self.last = metrics['time']
+        means = ' '.join("{0}:{1:.1f}".format(sample_size, metrics['mean_guesses'][str(sample_size)])
+                         for sample_size in sorted(self.guesses))
+        eta = '?' if metrics['eta'] is None else format_duration(metrics['eta'])
+        if self.display:
+            self.stream.write("\r{games}/{total} games, {rate:.1f} games/s, {steps:.0f} steps/s, ETA {eta}, "
+                              "mean guesses {means}".format(games=self.games, total=self.total,
+                                                            rate=metrics['games_per_second'],
+                                                            steps=metrics['steps_per_second'],
+                                                            eta=eta, means=means))
+            self.stream.flush()
+        if self.metrics_path:
+            with open(self.metrics_path, 'a') as output:
+                output.write(json.dumps(metrics, sort_keys=True) + '\n')
+
+    def close(self):
+        """Report the final progress."""
+        self.report()
+        if self.display:
+            self.stream.write('\n')
+            self.stream.flush()
+
+
+def format_duration(seconds):
+    """Format a number of seconds as H:MM:SS.
+
+    >>> format_duration(3725)
+    '1:02:05'
+    """
+    minutes, seconds = divmod(int(round(seconds)), 60)
+    hours, minutes = divmod(minutes, 60)
+    return "{0}:{1:02d}:{2:02d}".format(hours, minutes, seconds)
+
+
+if __name__ == '__main__':  # pragma: no cover
+    logging.basicConfig(format=settings.DEFAULT_LOGGING_FORMAT, level=settings.DEFAULT_LOGGING_LEVEL)
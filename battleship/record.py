@@ -0,0 +1,144 @@
+#!/usr/bin/env python
+
+"""
+Compact binary records of simulated games for offline analysis and replay.
+
+A record file starts with a short header followed by one record per game:
+
+    rows (1 byte), columns (1 byte), sample size (4 bytes), shot count (2 bytes)
+    ship placement bitmask (one bit per cell, little-endian)
+    ordered shots (one byte per cell index)
+
+Cells are indexed row by row from 0 at the top left corner.
+"""
+
+import os
+import mmap
+import struct
+import logging
+from collections import namedtuple
+
+from battleship.game import PlacementGrid
+from battleship import settings
+
+MAGIC = b'BSGR\x01'
+HEADER = struct.Struct('<BBiH')
+MAX_CELLS = 256
+
+
+class GameRecord(namedtuple('GameRecord', 'rows cols sample_size placements shots')):
+    """Single recorded game: placement bitmask and ordered list of (row, col) shots."""
+
+    __slots__ = ()
+
+    @property
+    def guesses(self):
+        """Return the number of guesses taken to win the game."""
+        return len(self.shots)
+
+    def get_placement_grid(self):
+        """Return a new PlacementGrid containing the recorded ships."""
+        grid = PlacementGrid(self.rows, self.cols)
+        for index in range(self.rows * self.cols):
+            if self.placements >> index & 1:
+                grid.set_cell(index // self.cols + 1, index % self.cols + 1, PlacementGrid.PLACEMENT)
+        return grid
+
+
+def get_mask_size(rows, cols):
+    """Return the number of bytes used for a placement bitmask."""
+    return (rows * cols + 7) // 8
+
+
+def encode(sample_size, placements, shots):
+    """Convert a game to its binary representation.
+
+    @param sample_size: number of samples the game was played with
+    @param placements: PlacementGrid the game was played against
+    @param shots: ordered list of (row, col) guesses
+    @return: record as bytes
+    """
+    rows, cols = placements.rows, placements.cols
+    if rows * cols > MAX_CELLS:
+        raise ValueError("records support at most {0} cells".format(MAX_CELLS))
+    mask = 0
+    for (row, col), value in placements:
+        if value == PlacementGrid.PLACEMENT:
+            mask |= 1 << ((row - 1) * cols + col - 1)
+    data = bytearray(HEADER.pack(rows, cols, sample_size, len(shots)))
+    data.extend((mask >> (8 * index)) & 0xFF for index in range(get_mask_size(rows, cols)))
+    data.extend((row - 1) * cols + col - 1 for row, col in shots)
+    return bytes(data)
+
+
+class Writer(object):
+    """Appends game records to a file."""
+
+    def __init__(self, path):
+        """Create a new record file.
+
+        @param path: record file to create
+        """
+        self.path = path
+        self.file = open(path, 'wb')
+        self.file.write(MAGIC)
+        self.count = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_exc):
+        self.close()
+
+    def write(self, sample_size, placements, shots):
+        """Record a single game (see encode)."""
+        self.file.write(encode(sample_size, placements, shots))
+        self.count += 1
+
+    def close(self):
+        """Close the record file."""
+        self.file.close()
+        logging.info("recorded {0} games to {1}".format(self.count, self.path))
+
+
+def read(path):
+    """Iterate through the games in a record file using a memory map.
+
+    @param path: record file to read
+    @return: generator of GameRecord
+    """
+    with open(path, 'rb') as data:
+        if os.fstat(data.fileno()).st_size < len(MAGIC):  # empty files cannot be mapped
+            raise ValueError("not a game record file: {0}".format(path))
+        memory = mmap.mmap(data.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            if memory[:len(MAGIC)] != MAGIC:
+                raise ValueError("not a game record file: {0}".format(path))
+            offset = len(MAGIC)
+            while offset < len(memory):
+                if offset + HEADER.size > len(memory):
+                    raise ValueError("truncated game record file: {0}".format(path))
+                rows, cols, sample_size, count = HEADER.unpack_from(memory, offset)
+                offset += HEADER.size
+                size = get_mask_size(rows, cols)
+                if offset + size + count > len(memory):
+                    raise ValueError("truncated game record file: {0}".format(path))
+                mask = 0
+                for index, byte in enumerate(bytearray(memory[offset:offset + size])):
+                    mask |= byte << (8 * index)
+                offset += size
+                shots = tuple((index // cols + 1, index % cols + 1)
+                              for index in bytearray(memory[offset:offset + count]))
+                offset += count
+                yield GameRecord(rows, cols, sample_size, mask, shots)
+        finally:
+            memory.close()
+
+
+def load(path):
+    """Return a list of all games in a record file."""
+    return list(read(path))
+
+
+if __name__ == '__main__':  # pragma: no cover
+    logging.basicConfig(format=settings.DEFAULT_LOGGING_FORMAT, level=settings.DEFAULT_LOGGING_LEVEL)
@@ -0,0 +1,223 @@
+#!/usr/bin/env python
+
+"""
+Columnar storage of simulation results for queries and reports.
+
+Each game is a row across typed arrays (one per column), so a sweep of many
+games takes a few dozen bytes per game and queries only touch the columns
+they need. A results file starts with a short header followed by the
+strategy names and each column's values (little-endian):
+
+    row count (4 bytes), strategy count (2 bytes)
+    strategy names (2 byte length, UTF-8 text)
+    columns in the order of COLUMNS
+"""
+
+import sys
+import math
+import struct
+import logging
+from array import array
+
+from battleship import settings
+
+MAGIC = b'BSRS\x01'
+HEADER = struct.Struct('<IH')
+NAME = struct.Struct('<H')
+PHASES = ('target', 'sample')  # phases of a player's algorithm that are timed separately
+COLUMNS = (('strategy', 'i'),  # index of the strategy's name
+           ('sample_size', 'i'),
+           ('seed', 'i'),
+           ('guesses', 'i'),
+           ('steps', 'I'),
+           ('duration', 'd')) + tuple(('{0}_duration'.format(phase), 'd') for phase in PHASES)
+MAX_SEED = 2 ** 31 - 1  # largest seed the seed column can store
+NO_SEED = -1  # seed of games that were not seeded (seeds are never negative)
+MISSING = float('nan')  # duration of phases that were not timed
+
+
+class Results(object):
+    """Results of many games stored as typed columns."""
+
+    def __init__(self):
+        self.strategies = []  # names referenced by the strategy column
+        self.columns = dict((name, array(typecode)) for name, typecode in COLUMNS)
+
+    def __len__(self):
+        return len(self.columns['guesses'])
+
+    def get_strategy_index(self, strategy):
+        """Return the value used for a strategy name in the strategy column."""
+        try:
+            return self.strategies.index(strategy)
+        except ValueError:
+            self.strategies.append(strategy)
+            return len(self.strategies) - 1
+
+    def add(self, sample_size, guesses, steps, duration, strategy='montecarlo', seed=None, timings=None):
+        """Include the result of a single game.
+
+        @param sample_size: number of samples the game was played with
+        @param guesses: number of guesses required to win the game
+        @param steps: number of algorithm steps
+        @param duration: duration of the game in seconds
+        @param strategy: name of the strategy used to select guesses
+        @param seed: random seed the game was played with (0 to MAX_SEED)
+        @param timings: dictionary of seconds spent in each phase: {phase: seconds}
+        """
+        if seed is not None and not 0 <= seed <= MAX_SEED:
+            raise ValueError("seed must be between 0 and {0}: {1}".format(MAX_SEED, seed))
+        timings = timings or {}
+        columns = self.columns
+        columns['strategy'].append(self.get_strategy_index(strategy))
+        columns['sample_size'].append(sample_size)
+        columns['seed'].append(NO_SEED if seed is None else seed)
+        columns['guesses'].append(guesses)
+        columns['steps'].append(steps)
+        columns['duration'].append(duration)
+        for phase in PHASES:
+            columns[phase + '_duration'].append(timings.get(phase, MISSING))
+
+    def extend(self, other):
+        """Include every game from other results."""
+        codes = [self.get_strategy_index(strategy) for strategy in other.strategies]
+        for name, _typecode in COLUMNS:
+            if name == 'strategy':
+                self.columns[name].extend(array('i', (codes[code] for code in other.columns[name])))
+            else:
+                self.columns[name].extend(other.columns[name])
+
+    def get_column(self, name):
+        """Return the values of a column (strategy names for the strategy column)."""
+        if name == 'strategy':
+            return [self.strategies[code] for code in self.columns[name]]
+        return self.columns[name]
+
+    def take(self, indices):
+        """Return new results containing only the games at the given indices."""
+        results = Results()
+        results.strategies = list(self.strategies)
+        for name, typecode in COLUMNS:
+            values = self.columns[name]
+            results.columns[name] = array(typecode, [values[index] for index in indices])
+        return results
+
+    def where(self, **criteria):
+        """Return the games whose columns equal the given values.
+
+        >>> results = Results()
+        >>> results.add(0, 80, 80, 0.1, strategy='naive')
+        >>> results.add(10, 50, 900, 0.2)
+        >>> len(results.where(strategy='naive', sample_size=0))
+        1
+        """
+        indices = range(len(self))
+        for name, value in criteria.items():
+            if name == 'strategy':
+                if value not in self.strategies:
+                    return self.take([])
+                value = self.strategies.index(value)
+            values = self.columns[name]
+            indices = [index for index in indices if values[index] == value]
+        return self.take(indices)
+
+    def group_by(self, *names):
+        """Split the games by the values of one or more columns.
+
+        @param names: columns to group by
+        @return: dictionary of games in each group: {value or tuple of values: Results}
+        """
+        keys = zip(*(self.get_column(name) for name in names)) if len(names) > 1 else self.get_column(names[0])
+        groups = {}
+        for index, key in enumerate(keys):
+            groups.setdefault(key, []).append(index)
+        return dict((key, self.take(indices)) for key, indices in groups.items())
+
+    def summarize(self, *names):
+        """Aggregate the games in each group.
+
+        @param names: columns to group by (default: sample size)
+        @return: dictionary of aggregates: {value or tuple of values: stats.Aggregate}
+        """
+        from battleship import stats
+
+        return stats.aggregate(self.get_games(*names))
+
+    def mean(self, name):
+        """Return the mean of a numeric column, ignoring missing values."""
+        values = [value for value in self.columns[name] if not math.isnan(value)]
+        if not values:
+            return None
+        return sum(values) / float(len(values))
+
+    def get_games(self, *names):
+        """Return the results of each game grouped by the values of one or more columns.
+
+        @param names: columns to group by (default: sample size)
+        @return: dictionary of results: {value or tuple of values: [(guesses, steps, duration), ...]}
+        """
+        names = names or ('sample_size',)
+        keys = zip(*(self.get_column(name) for name in names)) if len(names) > 1 else self.get_column(names[0])
+        games = {}
+        for key, guesses, steps, duration in zip(keys, self.columns['guesses'], self.columns['steps'],
+                                                 self.columns['duration']):
+            games.setdefault(key, []).append((guesses, steps, duration))
+        return games
+
+    def save(self, path):
+        """Write the results to a file.
+
+        @param path: results file to create
+        @return: indicates file was created
+        """
+        with open(path, 'wb') as output:
+            output.write(MAGIC)
+            output.write(HEADER.pack(len(self), len(self.strategies)))
+            for strategy in self.strategies:
+                name = strategy.encode('utf-8')
+                output.write(NAME.pack(len(name)) + name)
+            for name, _typecode in COLUMNS:
+                values = self.columns[name]
+                if sys.byteorder == 'big':  # pragma: no cover, stored little-endian
+                    values = array(values.typecode, values)
+                    values.byteswap()
+                values.tofile(output)
+        logging.info("saved {0} results to {1}".format(len(self), path))
+        return True
+
+
+def load(path):
+    """Read results from a file.
+
+    @param path: results file to read
+    @return: Results
+    """
+    results = Results()
+    with open(path, 'rb') as data:
+
+        def read(size):
+            """Return the next bytes of the file, which must not end early."""
+            text = data.read(size)
+            if len(text) < size:
+                raise ValueError("truncated results file: {0}".format(path))
+            return text
+
+        if data.read(len(MAGIC)) != MAGIC:
+            raise ValueError("not a results file: {0}".format(path))
+        count, strategies = HEADER.unpack(read(HEADER.size))
+        for _ in range(strategies):
+            size, = NAME.unpack(read(NAME.size))
+            results.strategies.append(read(size).decode('utf-8'))
+        for name, _typecode in COLUMNS:
+            values = results.columns[name]
+            try:
+                values.fromfile(data, count)
+            except EOFError:
+                raise ValueError("truncated results file: {0}".format(path))
+            if sys.byteorder == 'big':  # pragma: no cover, stored little-endian
+                values.byteswap()
+    return results
+
+
+if __name__ == '__main__':  # pragma: no cover
+    logging.basicConfig(format=settings.DEFAULT_LOGGING_FORMAT, level=settings.DEFAULT_LOGGING_LEVEL)
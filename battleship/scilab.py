@@ -6,7 +6,8 @@ Functions for interacting with Scilab for report generation and statistical anal
 
 import logging
 
-import settings
+from battleship.game import StepCounter  # pylint: disable=W0611
+from battleship import settings
 
 
 GRAPH_CODE = """
@@ -55,6 +56,63 @@ xclick();
 xdel(winsid());
 """.strip()
 GRAPH_INDENT = ';\n' + ' ' * 16
+GRAPH_MISSING = '%nan'
+
+SUMMARY_CODE = """
+// Generated code to display 3 graphs of summarized Battleship simulation results
+
+// Y coordinates
+sample_sizes   = [{sample_sizes}];
+games          = [{games}];
+
+// X coordinates
+guesses_mean   = [{guesses_mean}];
+guesses_std    = [{guesses_std}];
+guesses_p10    = [{guesses_p10}];
+guesses_p50    = [{guesses_p50}];
+guesses_p90    = [{guesses_p90}];
+steps_mean     = [{steps_mean}];
+steps_std      = [{steps_std}];
+durations_mean = [{durations_mean}];
+durations_std  = [{durations_std}];
+
+// Graph number of rounds vs. sample sizes
+subplot(1, 3, 1);
+title ("Algorithm Accuracy");
+plot(sample_sizes, guesses_mean, '-o', sample_sizes, guesses_p10, ':', sample_sizes, guesses_p50, '--', sample_sizes, guesses_p90, ':');
+errbar(sample_sizes, guesses_mean, guesses_std, guesses_std);
+axes = gca();
+axes.sub_ticks = [0, 0];
+axes.data_bounds(:,1) = [{min};{max}];
+xlabel ("Monte Carlo Sample Size");
+ylabel ("Number of Guesses Required");
+
+// Graph algorithm steps vs. sample sizes
+subplot(1, 3, 2);
+title ("Algorithm Efficiency (Steps)");
+plot(sample_sizes, steps_mean, '-o');
+errbar(sample_sizes, steps_mean, steps_std, steps_std);
+axes = gca();
+axes.sub_ticks = [0, 0];
+axes.data_bounds(:,1) = [{min};{max}];
+xlabel ("Monte Carlo Sample Size");
+ylabel ("Number Steps Per Game");
+
+// Graph game duration vs. sample sizes
+subplot(1, 3, 3);
+title ("Algorithm Efficiency (Duration)");
+plot(sample_sizes, durations_mean, '-o');
+errbar(sample_sizes, durations_mean, durations_std, durations_std);
+axes = gca();
+axes.sub_ticks = [0, 0];
+axes.data_bounds(:,1) = [{min};{max}];
+xlabel ("Monte Carlo Sample Size");
+ylabel ("Simulation Duration (Seconds)");
+
+// Close the window after a mouse click
+xclick();
+xdel(winsid());
+""".strip()
 
 SAMPLE_CODE = """
 // Generated code to display the Monte Carlo experiments for each round of a game
@@ -88,31 +146,17 @@ end
 """.strip()
 
 
-class StepCounter(object):
-    """Basic counter to store the number of steps taken during an algorithm."""
-
-    def __init__(self):
-        self.steps = 0
-
-    def __int__(self):
-        return self.steps
-
-    def increment(self):
-        """Increment counter."""
-        self.steps += 1
-
-    def value(self):
-        """Return counter's value."""
-        return self.steps
-
-
 def write_graph(results, path):
     """Create Scilab code to store simulation results.
 
     @param results: dictionary of results: {sample_size: [(guesses, steps, duration), ...]}
     @path path: Scilab file to create
-    @return: indicates file was created
+    @return: indicates file was created (or there were no results to graph)
     """
+    if not results:
+        logging.warning("no results to graph")
+        return True
+
     code = format_graph_code(results)
 
     with open(path, 'w') as graph:
@@ -151,8 +195,66 @@ def get_column_text(dictionary, column):
     @return: text table
     """
     keys = sorted(dictionary.keys())
-    count = len(dictionary[keys[0]])
-    return GRAPH_INDENT.join(''.join('{:<15}'.format(dictionary[key][i][column]) for key in keys) for i in range(count))
+    count = max(len(dictionary[key]) for key in keys)
+    return GRAPH_INDENT.join(''.join('{:<15}'.format(dictionary[key][i][column] if i < len(dictionary[key])
+                                                     else GRAPH_MISSING) for key in keys) for i in range(count))
+
+
+def write_summary(aggregates, path):
+    """Create Scilab code to graph aggregated simulation results.
+
+    @param aggregates: dictionary of aggregates: {sample_size: stats.Aggregate}
+    @path path: Scilab file to create
+    @return: indicates file was created (or there were no results to graph)
+    """
+    if not aggregates:
+        logging.warning("no results to graph")
+        return True
+
+    code = format_summary_code(aggregates)
+
+    with open(path, 'w') as graph:
+        graph.write(code)
+
+    return True
+
+
+def format_summary_code(aggregates):
+    """Generate Scilab code to graph aggregated results.
+
+    @param aggregates: dictionary of aggregates: {sample_size: stats.Aggregate}
+    @return: Scilab code as text
+    """
+    keys = sorted(aggregates.keys())
+
+    def row(function):
+        """Format one value per sample size as a row vector."""
+        return ''.join('{:<15}'.format(format_number(function(aggregates[key]))) for key in keys)
+
+    code = SUMMARY_CODE.format(sample_sizes=''.join('{:<15}'.format(key) for key in keys),
+                               games=row(lambda summary: summary.count),
+                               guesses_mean=row(lambda summary: summary.guesses.mean),
+                               guesses_std=row(lambda summary: summary.guesses.std()),
+                               guesses_p10=row(lambda summary: summary.percentile(10)),
+                               guesses_p50=row(lambda summary: summary.percentile(50)),
+                               guesses_p90=row(lambda summary: summary.percentile(90)),
+                               steps_mean=row(lambda summary: summary.steps.mean),
+                               steps_std=row(lambda summary: summary.steps.std()),
+                               durations_mean=row(lambda summary: summary.durations.mean),
+                               durations_std=row(lambda summary: summary.durations.std()),
+                               min=min(keys) - 5,
+                               max=max(keys) + 5)
+
+    return code
+
+
+def format_number(value):
+    """Format a number for Scilab code."""
+    if value is None:
+        return GRAPH_MISSING
+    if isinstance(value, float):
+        return '{0:.6g}'.format(value)
+    return str(value)
 
 
 def write_sample(log, path):
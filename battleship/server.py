@@ -0,0 +1,266 @@
+#!/usr/bin/env python
+
+"""
+Local service hosting many concurrent simulated Battleship games.
+
+Clients connect over TCP and send one command per line:
+
+    NEW [SAMPLE_SIZE [STRATEGY]]   start a game, replies "OK <game>"
+    GUESS <game> <row> <col>       take a shot, replies "HIT", "MISS", or "WON"
+    MOVE <game> [SECONDS]          ask the computer player, replies "OK <row> <col> <samples>"
+    QUIT <game>                    end a game, replies "OK"
+
+Failures are reported as "ERROR <message>". Computer moves are calculated in an
+executor so a slow Monte Carlo turn does not stall the other games, and an optional
+time limit bounds the response time of each move. The move is calculated on a copy
+of the game's player, and later commands for the same game wait until it completes.
+"""
+
+import copy
+import argparse
+import logging
+
+try:
+    import asyncio
+except ImportError:  # pragma: no cover, Python 2
+    asyncio = None
+
+from battleship import game
+from battleship import montecarlo
+from battleship import settings
+
+__program__ = 'battleship-server'
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8642
+
+
+def main():  # pragma: no cover
+    """Process command-line arguments and run the game server.
+    """
+    # Get arguments
+    parser = argparse.ArgumentParser(prog=__program__, description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default=DEFAULT_HOST, help="address to listen on")
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help="port to listen on")
+    parser.add_argument('--workers', metavar='N', type=int, default=0,
+                        help="number of processes for computer moves (0 for threads)")
+    parser.add_argument('-x', '--verbose', action='store_true', help="enable verbose logging")
+    args = parser.parse_args()
+    if asyncio is None:
+        parser.error("asyncio is required to run the server")
+
+    # Set logging level
+    if args.verbose:
+        logging.basicConfig(format=settings.VERBOSE_LOGGING_FORMAT, level=settings.VERBOSE_LOGGING_LEVEL)
+    else:
+        logging.basicConfig(format=settings.DEFAULT_LOGGING_FORMAT, level=settings.SPARSE_LOGGING_LEVEL)
+
+    # Create the executor for computer moves
+    executor = None
+    if args.workers:
+        from concurrent.futures import ProcessPoolExecutor
+        executor = ProcessPoolExecutor(args.workers)
+
+    # Run the server until cancelled
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    server = loop.run_until_complete(serve(Service(executor), args.host, args.port, loop))
+    logging.warning("serving games on {0}:{1}".format(args.host, args.port))
+    try:
+        loop.run_forever()
+    except KeyboardInterrupt:
+        logging.warning("user cancelled the server")
+    finally:
+        server.close()
+        loop.run_until_complete(server.wait_closed())
+        loop.close()
+
+
+class Match(object):
+    """A single game against a randomly placed field."""
+
+    def __init__(self, sample_size=0, strategy='montecarlo'):
+        """Create a new game.
+
+        @param sample_size: number of samples for the computer player's Monte Carlo algorithm
+        @param strategy: name of the registered strategy used for computer moves
+        """
+        self.placements = game.PlacementGrid()
+        self.placements.initialize()
+        self.shots = game.ShotsGrid()
+        self.player = montecarlo.get_strategy(strategy, sample_size)
+        self.counter = game.StepCounter()
+        self.move = None  # future of the computer move in progress
+        self.waiting = []  # commands received during the move: [(line, future), ...]
+
+    def guess(self, row, col):
+        """Take a shot at the field.
+
+        @param row: 1-indexed row to guess
+        @param col: 1-indexed column to guess
+        @return: 'HIT', 'MISS', or 'WON'
+        """
+        if not self.shots.is_empty(row, col):
+            raise ValueError("already guessed ({0},{1})".format(row, col))
+        hit = self.shots.guess(row, col, self.placements)
+        self.player.observe(row, col, hit)
+        if self.shots.is_won():
+            return 'WON'
+        return 'HIT' if hit else 'MISS'
+
+
+def get_move(player, shots, counter, time_limit=None):
+    """Return a player's next guess, samples taken, and updated state (module-level so it can run in a process pool).
+
+    The player and counter are returned so thread and process pools both keep their changes.
+    """
+    row, col = player.get_guess(shots, counter, time_limit=time_limit)
+    return row, col, getattr(player, 'samples', 0), player, counter
+
+
+class Service(object):
+    """Collection of games driven by text commands."""
+
+    def __init__(self, executor=None):
+        """Create a new service.
+
+        @param executor: concurrent.futures executor for computer moves (default: loop's thread pool)
+        """
+        self.executor = executor
+        self.matches = {}
+        self.count = 0
+
+    def new_game(self, sample_size=0, strategy='montecarlo'):
+        """Start a new game and return its identifier."""
+        match = Match(sample_size, strategy)
+        self.count += 1
+        self.matches[self.count] = match
+        logging.info("started game {0} with {1} samples".format(self.count, sample_size))
+        return self.count
+
+    def get_match(self, text):
+        """Return the game with the given identifier."""
+        try:
+            return self.matches[int(text)]
+        except KeyError:
+            raise ValueError("unknown game: {0}".format(text))
+
+    def get_busy_match(self, line):
+        """Return the game a command must wait for, if its computer move is in progress."""
+        words = line.split()
+        if len(words) > 1 and words[0].upper() in ('GUESS', 'MOVE', 'QUIT'):
+            try:
+                match = self.matches.get(int(words[1]))
+            except ValueError:
+                return None
+            if match is not None and match.move is not None:
+                return match
+        return None
+
+    def handle(self, line, loop):
+        """Process a single command.
+
+        @param line: text of the command
+        @param loop: event loop used to calculate computer moves
+        @return: future that will contain the reply text
+        """
+        future = loop.create_future()
+        match = self.get_busy_match(line)
+        if match:
+            match.waiting.append((line, future))
+        else:
+            self.execute(line, loop, future)
+        return future
+
+    def execute(self, line, loop, future):
+        """Process a command and set its reply on the future."""
+        words = line.split()
+        command = words[0].upper() if words else ''
+        try:
+            if command == 'NEW':
+                sample_size = int(words[1]) if len(words) > 1 else 0
+                if sample_size < 0:
+                    raise ValueError("sample size must not be negative: {0}".format(sample_size))
+                strategy = words[2] if len(words) > 2 else 'montecarlo'
+                future.set_result("OK {0}".format(self.new_game(sample_size, strategy)))
+            elif command == 'GUESS' and len(words) == 4:
+                match = self.get_match(words[1])
+                future.set_result(match.guess(int(words[2]), int(words[3])))
+            elif command == 'MOVE' and len(words) in (2, 3):
+                match = self.get_match(words[1])
+                time_limit = float(words[2]) if len(words) > 2 else None
+                match.move = loop.run_in_executor(self.executor, get_move, copy.deepcopy(match.player),
+                                                  copy.deepcopy(match.shots), copy.deepcopy(match.counter),
+                                                  time_limit)
+                match.move.add_done_callback(lambda done: self.finish_move(match, done, future, loop))
+            elif command == 'QUIT' and len(words) == 2:
+                self.get_match(words[1])
+                del self.matches[int(words[1])]
+                future.set_result("OK")
+            else:
+                future.set_result("ERROR unknown command: {0}".format(line.strip()))
+        except IndexError:
+            future.set_result("ERROR cell is off the grid")
+        except ValueError as exception:
+            future.set_result("ERROR {0}".format(exception))
+
+    def finish_move(self, match, done, future, loop):
+        """Store a completed computer move, reply, and run the commands waiting for it."""
+        match.move = None
+        if done.exception():
+            future.set_result("ERROR {0}".format(done.exception()))
+        else:
+            row, col, samples, match.player, match.counter = done.result()
+            future.set_result("OK {0} {1} {2}".format(row, col, samples))
+        while match.waiting and match.move is None:
+            line, waiting = match.waiting.pop(0)
+            self.execute(line, loop, waiting)
+
+
+class GameProtocol(asyncio.Protocol if asyncio else object):
+    """Line-based protocol replying to commands in the order they were received."""
+
+    def __init__(self, service, loop):
+        self.service = service
+        self.loop = loop
+        self.transport = None
+        self.buffer = b''
+        self.replies = []
+
+    def connection_made(self, transport):
+        """Store the transport for replies."""
+        self.transport = transport
+
+    def data_received(self, data):
+        """Process each complete line of data."""
+        self.buffer += data
+        while b'\n' in self.buffer:
+            line, self.buffer = self.buffer.split(b'\n', 1)
+            reply = self.service.handle(line.decode('ascii', 'replace'), self.loop)
+            self.replies.append(reply)
+            reply.add_done_callback(lambda _reply: self.flush())
+
+    def flush(self):
+        """Write completed replies while preserving command order."""
+        while self.replies and self.replies[0].done():
+            reply = self.replies.pop(0)
+            if not self.transport.is_closing():
+                self.transport.write((reply.result() + '\n').encode('ascii'))
+
+
+def serve(service, host=DEFAULT_HOST, port=DEFAULT_PORT, loop=None):
+    """Start serving games.
+
+    @param service: Service hosting the games
+    @param host: address to listen on
+    @param port: port to listen on (0 for any free port)
+    @param loop: event loop to run the server on
+    @return: coroutine that creates the server
+    """
+    loop = loop or asyncio.get_event_loop()
+    return loop.create_server(lambda: GameProtocol(service, loop), host, port)
+
+
+if __name__ == '__main__':  # pragma: no cover
+    main()
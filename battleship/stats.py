@@ -0,0 +1,155 @@
+#!/usr/bin/env python
+
+"""
+Summary statistics of simulation results.
+
+Each summary is computed in a single pass with constant memory (running
+moments and a histogram of guesses), so its size does not grow with the
+number of games it includes.
+"""
+
+import math
+import logging
+
+from battleship import settings
+
+PERCENTILES = (10, 50, 90)
+CSV_COLUMNS = ('sample_size', 'games',
+               'guesses_mean', 'guesses_std', 'guesses_min', 'guesses_max') + \
+    tuple('guesses_p{0}'.format(percent) for percent in PERCENTILES) + \
+    ('steps_mean', 'steps_std', 'durations_mean', 'durations_std')
+
+
+class Statistic(object):
+    """Running count, mean, variance, and range of a series of values."""
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.total = 0.0  # sum of squared differences from the mean
+        self.minimum = None
+        self.maximum = None
+
+    def add(self, value):
+        """Include a value in the statistic (Welford's algorithm)."""
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / float(self.count)
+        self.total += delta * (value - self.mean)
+        if self.minimum is None or value < self.minimum:
+            self.minimum = value
+        if self.maximum is None or value > self.maximum:
+            self.maximum = value
+
+    def variance(self):
+        """Return the sample variance."""
+        if self.count < 2:
+            return 0.0
+        return self.total / (self.count - 1)
+
+    def std(self):
+        """Return the sample standard deviation."""
+        return math.sqrt(self.variance())
+
+
+class Aggregate(object):
+    """Summary of the games played with a single sample size."""
+
+    def __init__(self):
+        self.guesses = Statistic()
+        self.steps = Statistic()
+        self.durations = Statistic()
+        self.histogram = {}  # number of guesses: number of games
+
+    @property
+    def count(self):
+        """Return the number of games included."""
+        return self.guesses.count
+
+    def add(self, guesses, steps, duration):
+        """Include the result of a single game."""
+        self.guesses.add(guesses)
+        self.steps.add(steps)
+        self.durations.add(duration)
+        self.histogram[guesses] = self.histogram.get(guesses, 0) + 1
+
+    def percentile(self, percent):
+        """Return the number of guesses at the given percentile (nearest rank)."""
+        if not self.count:
+            return None
+        rank = max(1, int(math.ceil(percent / 100.0 * self.count)))
+        total = 0
+        for guesses in sorted(self.histogram):
+            total += self.histogram[guesses]
+            if total >= rank:
+                return guesses
+
+    def get_row(self):
+        """Return the summary values in the order of CSV_COLUMNS (excluding sample size)."""
+        return ((self.count,
+                 self.guesses.mean, self.guesses.std(), self.guesses.minimum, self.guesses.maximum) +
+                tuple(self.percentile(percent) for percent in PERCENTILES) +
+                (self.steps.mean, self.steps.std(), self.durations.mean, self.durations.std()))
+
+
+def aggregate(results, aggregates=None):
+    """Summarize raw results.
+
+    @param results: dictionary of results: {sample_size: [(guesses, steps, duration), ...]}
+    @param aggregates: existing dictionary of aggregates to update
+    @return: dictionary of aggregates: {sample_size: Aggregate}
+    """
+    aggregates = {} if aggregates is None else aggregates
+    for sample_size, games in results.items():
+        summary = aggregates.setdefault(sample_size, Aggregate())
+        for guesses, steps, duration in games:
+            summary.add(guesses, steps, duration)
+    return aggregates
+
+
+def is_grouped(aggregates):
+    """Determine if aggregates are keyed by (strategy, sample_size) instead of sample size."""
+    return any(isinstance(key, tuple) for key in aggregates)
+
+
+def format_summary(aggregates):
+    """Generate a text table of aggregated results.
+
+    @param aggregates: dictionary of aggregates: {sample_size or (strategy, sample_size): Aggregate}
+    @return: table as text
+    """
+    grouped = is_grouped(aggregates)
+    lines = [("{:>12} ".format("strategy") if grouped else '') +
+             "{:>8} {:>8} {:>10} {:>8} {:>6} {:>6} {:>6} {:>12} {:>10}".format(
+                 "samples", "games", "guesses", "std", "p10", "p50", "p90", "steps", "seconds")]
+    for key in sorted(aggregates):
+        strategy, sample_size = key if grouped else (None, key)
+        summary = aggregates[key]
+        lines.append(("{:>12} ".format(strategy) if grouped else '') +
+                     "{:>8} {:>8} {:>10.2f} {:>8.2f} {:>6} {:>6} {:>6} {:>12.1f} {:>10.4f}".format(
+                         sample_size, summary.count, summary.guesses.mean, summary.guesses.std(),
+                         *(tuple(summary.percentile(percent) for percent in PERCENTILES) +
+                           (summary.steps.mean, summary.durations.mean))))
+    return '\n'.join(lines)
+
+
+def write_csv(aggregates, path):
+    """Create a CSV file of aggregated results.
+
+    @param aggregates: dictionary of aggregates: {sample_size or (strategy, sample_size): Aggregate}
+    @path path: CSV file to create (with a leading strategy column when grouped by strategy)
+    @return: indicates file was created
+    """
+    grouped = is_grouped(aggregates)
+    with open(path, 'w') as csv:
+        csv.write(','.join((('strategy',) if grouped else ()) + CSV_COLUMNS) + '\n')
+        for key in sorted(aggregates):
+            values = (key if grouped else (key,)) + aggregates[key].get_row()
+            csv.write(','.join('{0:g}'.format(value) if isinstance(value, float) else str(value)
+                               for value in values) + '\n')
+
+    return True
+
+
+if __name__ == '__main__':  # pragma: no cover
+    logging.basicConfig(format=settings.DEFAULT_LOGGING_FORMAT, level=settings.DEFAULT_LOGGING_LEVEL)
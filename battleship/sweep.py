@@ -0,0 +1,221 @@
+#!/usr/bin/env python
+
+"""
+Distribution of large parameter sweeps across several workers or machines.
+
+A sweep is split into chunks of games (sample size, strategy, seed range) that
+are stored in a queue directory, which can live on a shared filesystem:
+
+    <queue>/pending/   chunks waiting for a worker
+    <queue>/claimed/   chunks being played (touched after every game)
+    <queue>/done/      results of completed chunks
+
+Workers claim chunks by atomically renaming them. Claims that have not been
+touched within a timeout are returned to the queue, so a worker can be
+restarted at any time without losing work.
+"""
+
+import os
+import json
+import time
+import random
+import logging
+
+from battleship import settings
+
+PENDING = 'pending'
+CLAIMED = 'claimed'
+DONE = 'done'
+
+DEFAULT_CHUNK_SIZE = 10
+DEFAULT_TIMEOUT = 600  # seconds without progress before a claim is abandoned
+
+
+def get_folder(directory, name):
+    """Return the path to a queue folder, creating it if needed."""
+    path = os.path.join(directory, name)
+    if not os.path.isdir(path):
+        try:
+            os.makedirs(path)
+        except OSError:  # pragma: no cover, created by another worker
+            pass
+    return path
+
+
+def write_json(path, data):
+    """Atomically write data to a JSON file."""
+    temp = path + '.tmp'
+    with open(temp, 'w') as output:
+        json.dump(data, output)
+    os.rename(temp, path)
+
+
+def read_json(path):
+    """Read data from a JSON file."""
+    with open(path) as data:
+        return json.load(data)
+
+
+def split(directory, sample_sizes, repetitions, chunk_size=DEFAULT_CHUNK_SIZE, seed=0, strategy='montecarlo'):
+    """Add the chunks of a sweep to a queue.
+
+    @param directory: path of the queue
+    @param sample_sizes: list of sample sizes for the Monte Carlo algorithm
+    @param repetitions: number of games to play for each sample size
+    @param chunk_size: maximum number of games in each chunk
+    @param seed: random seed of the first game for each sample size
+    @param strategy: name of the registered strategy used to select guesses
+    @return: number of chunks created
+    """
+    pending = get_folder(directory, PENDING)
+    get_folder(directory, CLAIMED)
+    get_folder(directory, DONE)
+    count = 0
+    for sample_size in sample_sizes:
+        for start in range(0, repetitions, chunk_size):
+            chunk = {'id': "{0}-{1:06d}-{2:09d}".format(strategy, sample_size, seed + start),
+                     'strategy': strategy,
+                     'sample_size': sample_size,
+                     'seed': seed + start,
+                     'count': min(chunk_size, repetitions - start)}
+            write_json(os.path.join(pending, chunk['id'] + '.json'), chunk)
+            count += 1
+    logging.info("split sweep into {0} chunks in {1}".format(count, directory))
+    return count
+
+
+def requeue(directory, timeout=DEFAULT_TIMEOUT):
+    """Return abandoned claims to the queue.
+
+    @param directory: path of the queue
+    @param timeout: seconds since a claim's last progress before it is abandoned
+    @return: number of chunks returned to the queue
+    """
+    claimed = get_folder(directory, CLAIMED)
+    pending = get_folder(directory, PENDING)
+    count = 0
+    for name in sorted(os.listdir(claimed)):
+        path = os.path.join(claimed, name)
+        try:
+            if time.time() - os.path.getmtime(path) >= timeout:
+                os.rename(path, os.path.join(pending, name))
+                logging.warning("returned abandoned chunk {0} to the queue".format(name))
+                count += 1
+        except OSError:  # pragma: no cover, completed or requeued by another worker
+            pass
+    return count
+
+
+def claim(directory):
+    """Take the next chunk from the queue.
+
+    @param directory: path of the queue
+    @return: chunk dictionary or None if the queue is empty
+    """
+    pending = get_folder(directory, PENDING)
+    claimed = get_folder(directory, CLAIMED)
+    done = get_folder(directory, DONE)
+    for name in sorted(os.listdir(pending)):
+        if not name.endswith('.json'):
+            continue
+        path = os.path.join(claimed, name)
+        try:
+            os.rename(os.path.join(pending, name), path)
+        except OSError:  # pragma: no cover, claimed by another worker
+            continue
+        if os.path.exists(os.path.join(done, name)):  # finished by a worker that was presumed lost
+            os.remove(path)
+            continue
+        os.utime(path, None)
+        return read_json(path)
+    return None
+
+
+def play(chunk, heartbeat=None):
+    """Play the games in a chunk.
+
+    @param chunk: chunk dictionary
+    @param heartbeat: function to call after each game
+    @return: list of (guesses, steps, duration, timings)
+    """
+    from battleship import main
+
+    results = []
+    for index in range(chunk['count']):
+        random.seed(chunk['seed'] + index)
+        timings = {}
+        results.append(main.simulation(chunk['sample_size'], strategy=chunk['strategy'], timings=timings) +
+                       (timings,))
+        if heartbeat:
+            heartbeat()
+    return results
+
+
+def work(directory, timeout=DEFAULT_TIMEOUT, limit=None):
+    """Play chunks from the queue until it is empty.
+
+    @param directory: path of the queue
+    @param timeout: seconds since a claim's last progress before it is abandoned
+    @param limit: maximum number of chunks to play
+    @return: number of chunks completed
+    """
+    claimed = get_folder(directory, CLAIMED)
+    done = get_folder(directory, DONE)
+    count = 0
+    while limit is None or count < limit:
+        requeue(directory, timeout)
+        chunk = claim(directory)
+        if chunk is None:
+            break
+        name = chunk['id'] + '.json'
+        path = os.path.join(claimed, name)
+        logging.info("playing chunk {0}...".format(chunk['id']))
+
+        def heartbeat():
+            """Show the claim is still making progress."""
+            try:
+                os.utime(path, None)
+            except OSError:  # pragma: no cover, requeued by another worker
+                pass
+
+        chunk['results'] = play(chunk, heartbeat)
+        write_json(os.path.join(done, name), chunk)
+        try:
+            os.remove(path)
+        except OSError:  # pragma: no cover, requeued by another worker
+            pass
+        count += 1
+    logging.info("completed {0} chunks".format(count))
+    return count
+
+
+def get_status(directory):
+    """Return the number of pending, claimed, and completed chunks."""
+    return tuple(len([name for name in os.listdir(get_folder(directory, folder)) if name.endswith('.json')])
+                 for folder in (PENDING, CLAIMED, DONE))
+
+
+def merge(directory):
+    """Combine the results of all completed chunks.
+
+    @param directory: path of the queue
+    @return: results.Results of every game, including its seed
+    """
+    from battleship.results import Results
+
+    done = get_folder(directory, DONE)
+    results = Results()
+    for name in sorted(os.listdir(done)):
+        if name.endswith('.json'):
+            chunk = read_json(os.path.join(done, name))
+            for index, result in enumerate(chunk['results']):
+                results.add(chunk['sample_size'], *result[:3], strategy=chunk['strategy'],
+                            seed=chunk['seed'] + index, timings=result[3] if len(result) > 3 else None)
+    pending, claimed, _done = get_status(directory)
+    if pending or claimed:
+        logging.warning("merged a partial sweep: {0} chunks are not complete".format(pending + claimed))
+    return results
+
+
+if __name__ == '__main__':  # pragma: no cover
+    logging.basicConfig(format=settings.DEFAULT_LOGGING_FORMAT, level=settings.DEFAULT_LOGGING_LEVEL)
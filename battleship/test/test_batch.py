@@ -0,0 +1,97 @@
+#!/usr/bin/env python
+
+"""
+Unit tests for the batched simulation functions.
+"""
+
+import tempfile
+import unittest
+import logging
+
+from battleship import batch
+from battleship import game
+from battleship import main
+from battleship import settings
+
+
+class TestBatch(unittest.TestCase):  # pylint: disable=R0904
+    """Unit tests for the batch module."""
+
+    def test_position_table(self):
+        """Verify position tables contain cell indices."""
+        table = batch.PositionTable(2, 3)
+        self.assertEqual([(0, 1), (0, 3), (1, 2), (1, 4), (2, 5), (3, 4), (4, 5)], table.get(2))
+        self.assertIs(table.get(2), table.get(2))
+
+    def test_scheduler(self):
+        """Verify each request receives its own frequency map."""
+        scheduler = batch.Scheduler()
+        empty = game.ShotsGrid()
+        guessed = game.ShotsGrid()
+        for row in range(1, 11):
+            for col in range(1, 6):
+                guessed.set_cell(row, col, guessed.MISS)
+        counter = game.StepCounter()
+        self.assertEqual(0, scheduler.submit(empty, game.SHIPS, 10, counter))
+        self.assertEqual(1, scheduler.submit(guessed, (2,), 5))
+        self.assertEqual(2, scheduler.submit(empty, (11,), 3))  # too long to fit
+        first, second, third = scheduler.execute()
+        self.assertEqual(10, counter.value())
+        self.assertEqual(10 * sum(game.SHIPS), sum(value for _cell, value in first))
+        self.assertEqual(-50 + 5 * 2, sum(value for _cell, value in second))
+        self.assertEqual(0, sum(value for _cell, value in third))
+        self.assertEqual([], scheduler.requests)
+
+    def test_simulate(self):
+        """Verify several games can be played in lockstep."""
+        results = batch.simulate(3, 4, strategy='parity')
+        self.assertEqual(4, len(results))
+        for guesses, steps, duration in results:
+            self.assertGreaterEqual(guesses, sum(game.SHIPS))
+            self.assertGreater(steps, 0)
+            self.assertGreaterEqual(duration, 0)
+        self.assertRaises(ValueError, batch.simulate, 1, 1, strategy='naive')
+        self.assertRaises(ValueError, batch.simulate, 1, 1, batch_size=0)
+
+    def test_simulate_chunks(self):
+        """Verify games are played a limited number at a time against each board in turn."""
+        boards = []
+        for _ in range(2):
+            board = game.PlacementGrid()
+            board.initialize()
+            boards.append(board)
+        played = []
+
+        class Recorder(object):  # pylint: disable=R0903
+            """Records the board of each completed game."""
+
+            @staticmethod
+            def write(_sample_size, placements, _cells):
+                """Save the board of a game."""
+                played.append(placements)
+
+        results = batch.simulate(0, 5, boards=boards, recorder=Recorder(), batch_size=2)
+        self.assertEqual(5, len(results))
+        self.assertEqual(sorted(map(id, boards * 2 + boards[:1])), sorted(map(id, played)))
+        self.assertIs(boards[0], played[-1])
+
+    def test_supports(self):
+        """Verify only unweighted Monte Carlo strategies can be batched."""
+        self.assertTrue(batch.supports('montecarlo'))
+        self.assertTrue(batch.supports('parity'))
+        self.assertFalse(batch.supports('weighted'))
+        self.assertFalse(batch.supports('exact'))
+        self.assertFalse(batch.supports('kernel'))
+        self.assertFalse(batch.supports('naive'))
+
+    def test_run_batch(self):
+        """Verify the main program can run batched simulations."""
+        temp = tempfile.NamedTemporaryFile()
+        self.assertTrue(main.run([0, 2], 2, record_path=temp.name, batch=True))
+        self.assertTrue(main.run([1], 1, replay_path=temp.name, batch=True))
+        self.assertFalse(main.run([1], 1, strategy='weighted', batch=True))
+
+
+if __name__ == '__main__':
+    logging.basicConfig(format=settings.VERBOSE_LOGGING_FORMAT, level=settings.VERBOSE_LOGGING_LEVEL)
+    unittest.main()
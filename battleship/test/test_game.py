@@ -60,6 +60,27 @@ class TestPlacementGrid(unittest.TestCase):  # pylint: disable=R0904
         self.assertFalse(grid.place(3, 1, 3, 180))  # off the grid
         self.assertFalse(grid.place(0, 0, 2, 0))  # invalid row and column
 
+    def test_positions(self):
+        """Verify every free ship position is found."""
+        grid = game.PlacementGrid()
+        self.assertEqual(180, len(grid.get_positions(2)))
+        self.assertEqual(100, len(grid.get_positions(1)))
+        grid.set_cell(1, 1, grid.SKIP)
+        self.assertEqual(178, len(grid.get_positions(2)))
+
+    def test_sample_weighted(self):
+        """Verify weighted sampling places every ship."""
+        grid = game.PlacementGrid()
+        weight = grid.sample_weighted(game.SHIPS)
+        self.assertGreater(weight, 0)
+        self.assertEqual(sum(game.SHIPS), len([cell for cell, value in grid if value == grid.PLACEMENT]))
+
+    def test_sample_weighted_full(self):
+        """Verify a weighted sample has no weight when a ship cannot be placed."""
+        grid = game.PlacementGrid(1, 3)
+        self.assertEqual(0, grid.sample_weighted((4,)))
+        self.assertEqual(2, game.PlacementGrid(1, 3).sample_weighted((2,)))
+
 
 class TestShotsGrid(unittest.TestCase):  # pylint: disable=R0904
     """Unit tests for the ShotGrid class."""
@@ -109,6 +130,49 @@ class TestShotsGrid(unittest.TestCase):  # pylint: disable=R0904
         shots.guess(9, 9, placements)
         self.assertEqual(6, len(shots.get_target_cells()))
 
+    def test_targeting_unique(self):
+        """Verify cells adjacent to several hits are only targeted once."""
+        shots = game.ShotsGrid()
+        shots.set_cell(1, 1, shots.HIT)
+        shots.set_cell(2, 2, shots.HIT)
+        self.assertEqual([(1, 2), (2, 1), (2, 3), (3, 2)], shots.get_target_cells())
+
+    def test_targeting_line(self):
+        """Verify line targeting extends a line of hits."""
+        shots = game.ShotsGrid()
+        shots.set_cell(5, 5, shots.HIT)
+        shots.set_cell(5, 6, shots.HIT)
+        shots.set_cell(5, 7, shots.MISS)
+        self.assertEqual([(5, 4)], shots.get_target_cells(line=True))
+        shots.set_cell(5, 4, shots.MISS)
+        self.assertEqual(4, len(shots.get_target_cells(line=True)))
+
+    def test_tracked_cells(self):
+        """Verify the sets of hit and unguessed cells follow every change to the grid."""
+        shots = game.ShotsGrid(2, 2)
+        self.assertEqual(4, len(shots.unguessed_cells))
+        shots.set_cell(1, 1, shots.HIT)
+        shots.set_cell(1, 2, shots.MISS)
+        self.assertEqual(([(1, 1)], [(2, 1), (2, 2)]), (shots.get_hit_cells(), sorted(shots.unguessed_cells)))
+        shots.set_cell(1, 1, shots.UNGUESSED)
+        self.assertEqual([], shots.get_hit_cells())
+        self.assertEqual([(1, 1), (2, 1), (2, 2)], shots.get_unguessed_cells())
+
+    def test_neighbors(self):
+        """Verify adjacency tables are calculated for each grid size."""
+        table = game.get_neighbors(2, 3)
+        self.assertEqual(((2, 1), (1, 2)), table[(1, 1)])
+        self.assertEqual(3, len(table[(1, 2)]))
+        self.assertIs(table, game.get_neighbors(2, 3))
+
+    def test_parity(self):
+        """Verify parity cells form a lattice of unguessed cells."""
+        shots = game.ShotsGrid()
+        self.assertEqual(50, len(shots.get_parity_cells(2)))
+        self.assertEqual(33, len(shots.get_parity_cells(3)))
+        shots.set_cell(1, 1, shots.MISS)
+        self.assertEqual(49, len(shots.get_parity_cells(2)))
+
     def test_remaining_ships(self):
         """Verify the remaining ships can be guessed."""
         shots = game.ShotsGrid()
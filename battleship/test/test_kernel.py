@@ -0,0 +1,55 @@
+#!/usr/bin/env python
+
+"""
+Unit tests for the placement sampling kernel.
+"""
+
+import unittest
+import logging
+
+from battleship import kernel
+from battleship import game
+from battleship import settings
+
+
+class TestKernel(unittest.TestCase):  # pylint: disable=R0904
+    """Unit tests for the kernel module."""
+
+    def test_sample_counts(self):
+        """Verify ships are only placed in free cells."""
+        blocked = [(5, col) for col in range(1, 11)]
+        counts = kernel.sample_counts(10, 10, blocked, game.SHIPS, 50, seed=7, compiled=False)
+        self.assertEqual(100, len(counts))
+        self.assertEqual([0] * 10, counts[40:50])
+        self.assertLessEqual(sum(counts), 50 * sum(game.SHIPS))
+        self.assertGreater(sum(counts), 0)
+
+    def test_seed(self):
+        """Verify results are reproducible from the seed."""
+        first = kernel.sample_counts(10, 10, [], game.SHIPS, 20, seed=3, compiled=False)
+        second = kernel.sample_counts(10, 10, [], game.SHIPS, 20, seed=3, compiled=False)
+        third = kernel.sample_counts(10, 10, [], game.SHIPS, 20, seed=4, compiled=False)
+        self.assertEqual(first, second)
+        self.assertNotEqual(first, third)
+
+    def test_full_grid(self):
+        """Verify ships that do not fit are skipped."""
+        self.assertEqual([0, 0, 0], kernel.sample_counts(1, 3, [], (4,), 10, compiled=False))
+        self.assertEqual([10, 10, 10], kernel.sample_counts(1, 3, [], (3,), 10, compiled=False))
+
+    @unittest.skipIf(kernel.is_compiled(), "numba is installed")
+    def test_compiled_unavailable(self):
+        """Verify the compiled kernel cannot be requested without numba."""
+        self.assertRaises(RuntimeError, kernel.sample_counts, 10, 10, [], game.SHIPS, 1, compiled=True)
+
+    @unittest.skipUnless(kernel.is_compiled(), "numba is not installed")
+    def test_compiled(self):  # pragma: no cover, optional dependency
+        """Verify the compiled kernel matches the Python kernel."""
+        blocked = [(1, 1), (5, 5), (9, 2)]
+        self.assertEqual(kernel.sample_counts(10, 10, blocked, game.SHIPS, 200, seed=11, compiled=False),
+                         kernel.sample_counts(10, 10, blocked, game.SHIPS, 200, seed=11, compiled=True))
+
+
+if __name__ == '__main__':
+    logging.basicConfig(format=settings.VERBOSE_LOGGING_FORMAT, level=settings.VERBOSE_LOGGING_LEVEL)
+    unittest.main()
@@ -4,11 +4,16 @@
 Unit tests for the main Battleship Algorithms functionality.
 """
 
+import os
+import sys
+import argparse
 import unittest
 import tempfile
+import subprocess
 import logging
 
 from battleship import main
+from battleship import record
 from battleship import settings
 
 
@@ -20,11 +25,100 @@ class TestMain(unittest.TestCase):  # pylint: disable=R0904
         temp = tempfile.NamedTemporaryFile()
         self.assertTrue(main.run([0, 1], 2, graph_path=temp.name))
 
+    def test_run_empty(self):
+        """Verify simulations without any games can be reported."""
+        temp = tempfile.NamedTemporaryFile()
+        self.assertTrue(main.run([0], 0, graph_path=temp.name))
+        self.assertTrue(main.run([0], 0, graph_path=temp.name, raw=True))
+
+    def test_run_raw(self):
+        """Verify simulations can be run with raw graph and CSV generation."""
+        temp = tempfile.NamedTemporaryFile()
+        temp2 = tempfile.NamedTemporaryFile()
+        self.assertTrue(main.run([0, 1], 2, graph_path=temp.name, raw=True, csv_path=temp2.name))
+
+    def test_run_results(self):
+        """Verify the results of every game can be saved and reported again."""
+        from battleship import results
+        temp = tempfile.NamedTemporaryFile()
+        self.assertTrue(main.run([0, 1], 2, results_path=temp.name))
+        saved = results.load(temp.name)
+        self.assertEqual(4, len(saved))
+        self.assertEqual(2, len(saved.where(sample_size=1)))
+        csv = tempfile.NamedTemporaryFile()
+        self.assertTrue(main.report(saved, csv_path=csv.name))
+        self.assertTrue(main.report_saved(temp.name, summary=True))
+        self.assertFalse(main.report_saved(csv.name))
+
+    def test_run_seed(self):
+        """Verify seeded games are reproducible and their seeds are saved."""
+        from battleship import results
+        temp = tempfile.NamedTemporaryFile()
+        temp2 = tempfile.NamedTemporaryFile()
+        self.assertTrue(main.run([1], 3, results_path=temp.name, seed=7))
+        self.assertTrue(main.run([1], 3, results_path=temp2.name, seed=7))
+        first, second = results.load(temp.name), results.load(temp2.name)
+        self.assertEqual([7, 8, 9], list(first.get_column('seed')))
+        self.assertEqual(first.get_column('guesses'), second.get_column('guesses'))
+        self.assertFalse(main.run([1], 1, seed=7, batch=True))
+        self.assertFalse(main.run([0], 1, seed=2 ** 31))
+        self.assertFalse(main.run([0], 2, seed=2 ** 31 - 1))
+        self.assertFalse(main.run([0], 1, seed=-1))
+        self.assertRaises(argparse.ArgumentTypeError, main.seed, "-1")
+
+    def test_report_strategies(self):
+        """Verify results of several strategies are graphed separately."""
+        from battleship import results
+        saved = results.Results()
+        saved.add(0, 80, 80, 0.1, strategy='naive')
+        saved.add(0, 70, 70, 0.1)
+        saved.add(5, 60, 600, 0.2)
+        directory = tempfile.mkdtemp()
+        try:
+            path = os.path.join(directory, 'graph.sce')
+            self.assertTrue(main.report(saved, graph_path=path))
+            self.assertEqual(['graph-montecarlo.sce', 'graph-naive.sce'], sorted(os.listdir(directory)))
+        finally:
+            for name in os.listdir(directory):
+                os.remove(os.path.join(directory, name))
+            os.rmdir(directory)
+
     def test_run_logging(self):
         """Verify simulations can be run with sample generation."""
         temp = tempfile.NamedTemporaryFile()
         self.assertTrue(main.run([1], 1, sample_path=temp.name))
 
+    def test_run_strategy(self):
+        """Verify simulations can be run with a registered strategy."""
+        self.assertTrue(main.run([0], 1, strategy='naive'))
+        self.assertFalse(main.run([0], 1, strategy='unknown'))
+
+    def test_run_record_replay(self):
+        """Verify recorded boards can be replayed."""
+        temp = tempfile.NamedTemporaryFile()
+        self.assertTrue(main.run([0], 2, record_path=temp.name))
+        self.assertTrue(main.run([0, 1], 1, replay_path=temp.name))
+        empty = tempfile.NamedTemporaryFile()
+        self.assertFalse(main.run([0], 1, replay_path=empty.name))
+        record.Writer(empty.name).close()
+        self.assertFalse(main.run([0], 1, replay_path=empty.name))
+
+    def test_lazy_imports(self):
+        """Verify the entry point does not load the reporting or sampling engines."""
+        root = os.path.dirname(os.path.dirname(main.__file__))
+        code = ("import sys, battleship.main; "
+                "print(sorted(m for m, v in sys.modules.items() if v and m.startswith('battleship')))")
+        output = subprocess.check_output([sys.executable, '-c', code], cwd=root)
+        self.assertEqual("['battleship', 'battleship.game', 'battleship.main', 'battleship.settings']",
+                         output.decode('ascii').strip())
+
+    def test_run_logging_limits(self):
+        """Verify sample generation can be limited in size."""
+        temp = tempfile.NamedTemporaryFile()
+        self.assertTrue(main.run([1], 1, sample_path=temp.name, sample_limit=5, sample_top=3))
+        with open(temp.name) as sample:
+            self.assertEqual(5, sample.read().count("hist3d(round_") // 2)
+
     def test_run_invalid(self):
         """Verify sample genreation can only be performed on a single game."""
         temp = tempfile.NamedTemporaryFile()
@@ -4,6 +4,7 @@
 Unit tests for the Monte Carlo algorithm.
 """
 
+import sys
 import unittest
 import logging
 
@@ -24,12 +25,200 @@ class TestMonteCarlo(unittest.TestCase):  # pylint: disable=R0904
         player = montecarlo.Player(5)
         self.assertEqual((1, 2), player.get_guess(shots, scilab.StepCounter()))
 
+    def test_line_player(self):
+        """Verify the line strategy extends a line of hits."""
+        shots = game.ShotsGrid()
+        shots.set_cell(5, 5, game.ShotsGrid.HIT)
+        shots.set_cell(5, 6, game.ShotsGrid.HIT)
+        shots.set_cell(5, 4, game.ShotsGrid.MISS)
+        player = montecarlo.get_strategy('line', 5)
+        self.assertEqual((5, 7), player.get_guess(shots, scilab.StepCounter()))
+
     def test_player_sampling(self):
         """Verify a computer player guesses the right cell using sampling."""
         #shots = game.ShotsGrid()
         #player = montecarlo.Player(5)
         # TODO: complete test case
 
+    def test_get_strategy(self):
+        """Verify strategies can be created from the registry."""
+        player = montecarlo.get_strategy('montecarlo', 5)
+        self.assertIsInstance(player, montecarlo.Player)
+        self.assertEqual(5, player.sample_size)
+        self.assertRaises(ValueError, montecarlo.get_strategy, 'unknown')
+
+    def test_naive_player_observe(self):
+        """Verify a naive player never repeats an observed guess."""
+        shots = game.ShotsGrid()
+        player = montecarlo.NaivePlayer()
+        player.observe(1, 1, False)  # ignored before the first guess
+        for row, col in shots.get_unguessed_cells()[:-1]:
+            player.get_guess(shots, scilab.StepCounter())
+            player.observe(row, col, False)
+            player.observe(row, col, False)
+        self.assertEqual([(10, 10)], player.unguessed_cells)
+        self.assertEqual((10, 10), player.get_guess(shots, scilab.StepCounter()))
+
+    def test_player_time_limit(self):
+        """Verify a computer player stops sampling at the deadline."""
+        shots = game.ShotsGrid()
+        player = montecarlo.Player(1000000)
+        row, col = player.get_guess(shots, scilab.StepCounter(), time_limit=0.05)
+        self.assertTrue(shots.is_empty(row, col))
+        self.assertLess(player.samples, 1000000)
+        player.get_guess(shots, scilab.StepCounter(), time_limit=0)
+        self.assertEqual(0, player.samples)
+
+    def test_parity_player(self):
+        """Verify a parity player only hunts on the lattice of the smallest ship."""
+        shots = game.ShotsGrid()
+        player = montecarlo.get_strategy('parity', 5)
+        for _ in range(10):
+            row, col = player.get_guess(shots, scilab.StepCounter())
+            self.assertEqual(0, (row + col) % 2)
+        for row, col in shots.get_parity_cells(2):
+            shots.set_cell(row, col, game.ShotsGrid.MISS)
+        self.assertEqual(shots.get_unguessed_cells(), player.get_candidate_cells(shots, [2]))
+
+    def test_weighted_player(self):
+        """Verify a weighted player reports its effective sample size."""
+        shots = game.ShotsGrid()
+        shots.set_cell(5, 5, game.ShotsGrid.MISS)
+        player = montecarlo.get_strategy('weighted', 20)
+        row, col = player.get_guess(shots, scilab.StepCounter())
+        self.assertTrue(shots.is_empty(row, col))
+        self.assertGreater(player.effective_samples, 0)
+        self.assertLessEqual(player.effective_samples, 20 + 1e-9)
+
+    def test_weighted_player_no_fit(self):
+        """Verify weighted samples where a ship cannot fit are ignored."""
+        free_cells = [(1, 1), (1, 2)]
+        guessed_cells = [cell for cell, _value in game.ShotsGrid() if cell not in free_cells]
+        frequencies = montecarlo.FrequencyGrid()
+        player = montecarlo.get_strategy('weighted', 5)
+        counter = scilab.StepCounter()
+        self.assertEqual((0, 0), player.accumulate(frequencies, guessed_cells, [2, 2], free_cells, counter))
+        self.assertEqual(5, player.samples)
+        self.assertEqual([0, 0], [frequencies.get_cell(row, col) for row, col in free_cells])
+
+    def test_kernel_player(self):
+        """Verify a kernel player samples every cell around guesses."""
+        shots = game.ShotsGrid()
+        shots.set_cell(1, 1, game.ShotsGrid.MISS)
+        player = montecarlo.get_strategy('kernel', 30)
+        counter = scilab.StepCounter()
+        row, col = player.get_guess(shots, counter)
+        self.assertTrue(shots.is_empty(row, col))
+        self.assertEqual(30, player.samples)
+        self.assertEqual(30, counter.value())
+        player.get_guess(shots, counter, time_limit=0)
+        self.assertEqual(0, player.samples)
+
+    def test_frequency_log(self):
+        """Verify a frequency log reconstructs full grids."""
+        log = montecarlo.FrequencyLog()
+        self.assertFalse(log)
+        for value in range(1, 4):
+            grid = montecarlo.FrequencyGrid()
+            grid.set_cell(value, value, value)
+            log.append(grid)
+        log[-1].set_guessed_cells([(1, 1)])
+        self.assertEqual(3, len(log))
+        grids = list(log)
+        self.assertEqual(1, grids[0].get_cell(1, 1))
+        self.assertEqual(2, log[1].get_cell(2, 2))
+        self.assertEqual(montecarlo.FrequencyGrid.GUESSED, grids[2].get_cell(1, 1))
+
+    def test_frequency_log_limits(self):
+        """Verify a frequency log can be limited in rounds and cells."""
+        log = montecarlo.FrequencyLog(limit=2, top=1)
+        for _ in range(5):
+            grid = montecarlo.FrequencyGrid()
+            grid.set_cell(1, 1, 5)
+            grid.set_cell(2, 2, 3)
+            grid.set_guessed_cells([(3, 3)])
+            log.append(grid)
+        self.assertEqual(2, len(log))
+        first = log[0]
+        self.assertEqual((5, 0, -1), (first.get_cell(1, 1), first.get_cell(2, 2), first.get_cell(3, 3)))
+        self.assertEqual(3, log[1].get_cell(2, 2))
+        self.assertRaises(ValueError, montecarlo.FrequencyLog, 0)
+
+    def test_frequency_log_memory(self):
+        """Verify earlier rounds use less memory than full grids."""
+
+        def get_size(value):
+            """Return the memory used by a value and the containers within it."""
+            size = sys.getsizeof(value)
+            if isinstance(value, (list, tuple)):
+                size += sum(get_size(item) for item in value)
+            return size
+
+        log = montecarlo.FrequencyLog()
+        grid = montecarlo.FrequencyGrid()
+        for (row, col), _value in grid:
+            grid.set_cell(row, col, 1000 + row * col)
+        grid.set_guessed_cells([(1, 1), (5, 5)])
+        grid.set_hit_cells([(5, 5)])
+        log.append(grid)
+        log.append(montecarlo.FrequencyGrid())
+        self.assertLess(get_size(log.rounds[0]), get_size(grid.grid))
+        self.assertEqual(str(grid.grid), str(log[0].grid))
+        log = montecarlo.FrequencyLog(top=3)
+        log.append(grid)
+        log.append(montecarlo.FrequencyGrid())
+        self.assertLess(get_size(log.rounds[0]) * 5, get_size(grid.grid))
+        self.assertEqual(-4, log[0].get_cell(5, 5))
+        self.assertEqual(3, len([value for _cell, value in log[0] if value > 0]))
+
+    def test_frequency_log_large_values(self):
+        """Verify frequencies too large for 32-bit integers are kept."""
+        log = montecarlo.FrequencyLog()
+        grid = montecarlo.FrequencyGrid()
+        grid.set_cell(1, 1, 3 ** 40)
+        log.append(grid)
+        log.append(montecarlo.FrequencyGrid())
+        self.assertEqual(float(3 ** 40), log[0].get_cell(1, 1))
+
+    def test_enumerate_counts(self):
+        """Verify exact counts are calculated for small state spaces."""
+        guessed = [(1, 5)] + [(2, col) for col in range(1, 6)]
+        counts, configurations = montecarlo.enumerate_counts(2, 5, guessed, (2,))
+        self.assertEqual(3, configurations)
+        self.assertEqual({(1, 1): 1, (1, 2): 2, (1, 3): 2, (1, 4): 1}, counts)
+        counts, configurations = montecarlo.enumerate_counts(2, 5, guessed, (2, 2))
+        self.assertEqual(1, configurations)  # interchangeable ships are counted once
+        self.assertIsNone(montecarlo.enumerate_counts(2, 5, guessed, (5,)))
+        self.assertIsNone(montecarlo.enumerate_counts(2, 5, guessed, (3, 2)))  # each fits, but not together
+        self.assertIsNone(montecarlo.enumerate_counts(10, 10, [], game.SHIPS))
+
+    def test_count_positions(self):
+        """Verify positions are counted without building them."""
+        guessed = [(row, col) for row in range(1, 11) for col in range(1, 11) if (row * 7 + col * 3) % 5 == 0]
+        placements = game.PlacementGrid()
+        for row, col in guessed:
+            placements.set_cell(row, col, game.PlacementGrid.SKIP)
+        counts = montecarlo.count_positions(10, 10, guessed, (1, 2, 3, 5))
+        for length in (1, 2, 3, 5):
+            self.assertEqual(len(placements.get_positions(length)), counts[length])
+
+    def test_player_endgame(self):
+        """Verify a computer player uses exact counts in the endgame."""
+        shots = game.ShotsGrid()
+        for (row, col), _value in shots:
+            shots.set_cell(row, col, game.ShotsGrid.MISS)
+        for col in range(1, 5):
+            shots.set_cell(1, col, game.ShotsGrid.UNGUESSED)
+        for row in range(3, 6):
+            for col in range(1, 6):
+                shots.set_cell(row, col, game.ShotsGrid.HIT)  # sunk ships of lengths 5, 4, 3, 3
+        player = montecarlo.ExactPlayer(5)
+        self.assertIn(player.get_guess(shots, scilab.StepCounter()), [(1, 2), (1, 3)])
+        self.assertEqual(3, player.effective_samples)
+        player = montecarlo.Player(5)
+        player.get_guess(shots, scilab.StepCounter())
+        self.assertEqual(5, player.samples)  # only the exact strategy enumerates
+
     def test_get_best_cells(self):
         """Verify the best cells are returned."""
         frequencies = montecarlo.FrequencyGrid()
@@ -37,6 +226,7 @@ class TestMonteCarlo(unittest.TestCase):  # pylint: disable=R0904
         frequencies.set_cell(5, 5, 2)
         frequencies.set_cell(9, 9, 2)
         self.assertEqual(2, len(frequencies.get_best_cells()))
+        self.assertEqual([(1, 1)], frequencies.get_best_cells([(1, 1), (2, 2)]))
 
 
 if __name__ == '__main__':
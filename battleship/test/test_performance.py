@@ -0,0 +1,227 @@
+#!/usr/bin/env python
+
+"""
+Performance regression tests for the algorithm hot paths.
+
+Operation counts (cells visited and cells read) are deterministic and always
+checked. Timings are normalized by a calibration loop so they can be compared
+across machines, but they are still noisy, so they are only checked when the
+TEST_PERFORMANCE environment variable is set. Set TEST_PERFORMANCE=update to
+record new baselines after an intended change.
+"""
+
+import os
+import json
+import time
+import random
+import unittest
+import logging
+
+from battleship import game
+from battleship import montecarlo
+from battleship import kernel
+from battleship import settings
+
+BASELINES_PATH = os.path.join(os.path.dirname(__file__), 'files', 'performance.json')
+OPERATIONS_TOLERANCE = 1.5  # allowed ratio of measured to baseline operation counts
+TIMINGS_TOLERANCE = 3.0  # allowed ratio of measured to baseline normalized timings
+REPEAT = 3  # best of several timings is used to reduce noise
+
+
+def load_baselines():
+    """Return the stored baselines."""
+    with open(BASELINES_PATH) as baselines:
+        return json.load(baselines)
+
+
+def save_baseline(section, name, value):
+    """Store a new baseline value."""
+    baselines = load_baselines()
+    baselines[section][name] = value
+    with open(BASELINES_PATH, 'w') as output:
+        json.dump(baselines, output, indent=4, sort_keys=True)
+        output.write('\n')
+
+
+class OperationCounter(object):
+    """Counts cells visited by Grid iteration and cells read by Grid.get_cell."""
+
+    def __init__(self):
+        self.count = 0
+        self._iter = None
+        self._get_cell = None
+
+    def __enter__(self):
+        self._iter = original_iter = game.Grid.__iter__
+        self._get_cell = original_get_cell = game.Grid.get_cell
+
+        def counted_iter(grid):
+            """Count each cell visited."""
+            for item in original_iter(grid):
+                self.count += 1
+                yield item
+
+        def counted_get_cell(grid, row, col):
+            """Count each cell read."""
+            self.count += 1
+            return original_get_cell(grid, row, col)
+
+        game.Grid.__iter__ = counted_iter
+        game.Grid.get_cell = counted_get_cell
+        return self
+
+    def __exit__(self, *_exc):
+        game.Grid.__iter__ = self._iter
+        game.Grid.get_cell = self._get_cell
+
+
+def get_shots():
+    """Return a grid of shots in the hunt phase: scattered misses and a sunk destroyer."""
+    shots = game.ShotsGrid()
+    for row, col in ((1, 6), (2, 3), (3, 7), (4, 10), (5, 5), (6, 2), (7, 8), (10, 9),
+                     (8, 1), (8, 2), (9, 3), (10, 1), (10, 2)):
+        shots.set_cell(row, col, game.ShotsGrid.MISS)
+    for row, col in ((9, 1), (9, 2)):
+        shots.set_cell(row, col, game.ShotsGrid.HIT)
+    return shots
+
+
+def calibrate():
+    """Return the duration of a fixed Python workload."""
+    best = None
+    for _ in range(REPEAT):
+        start = time.time()
+        total = 0
+        for index in range(200000):
+            total += index * index % 7
+        duration = time.time() - start
+        best = duration if best is None else min(best, duration)
+    return best
+
+
+def measure(function):
+    """Return the best duration of several calls."""
+    best = None
+    for _ in range(REPEAT):
+        random.seed(0)
+        start = time.time()
+        function()
+        duration = time.time() - start
+        best = duration if best is None else min(best, duration)
+    return best
+
+
+def target_cells():
+    """Query targets repeatedly on a partially played grid."""
+    shots = get_shots()
+    for _ in range(100):
+        shots.get_unguessed_cells()
+        shots.get_target_cells()
+
+
+def monte_carlo_guess():
+    """Select a cell using Monte Carlo sampling."""
+    montecarlo.Player(100).get_monte_carlo_guess(get_shots(), game.StepCounter())
+
+
+def kernel_sample():
+    """Sample placements with the kernel."""
+    kernel.sample_counts(10, 10, get_shots().get_guessed_cells(), game.SHIPS, 200, compiled=False)
+
+
+class TestOperations(unittest.TestCase):  # pylint: disable=R0904
+    """Regression tests of deterministic operation counts."""
+
+    @classmethod
+    def setUpClass(cls):  # pylint: disable=C0103
+        cls.baselines = load_baselines()['operations']
+
+    def check(self, name, function):
+        """Verify the operations of a function have not increased significantly."""
+        random.seed(0)
+        with OperationCounter() as counter:
+            function()
+        if os.getenv('TEST_PERFORMANCE') == 'update':  # pragma: no cover, manual baseline update
+            save_baseline('operations', name, counter.count)
+            return
+        baseline = self.baselines[name]
+        logging.info("{0}: {1} operations (baseline {2})".format(name, counter.count, baseline))
+        self.assertLessEqual(counter.count, baseline * OPERATIONS_TOLERANCE,
+                             "{0} regressed: {1} operations vs. baseline {2}".format(name, counter.count, baseline))
+
+    def test_fixture(self):
+        """Verify the measured grid exercises the hunt phase rather than its early exits."""
+        shots = get_shots()
+        self.assertEqual([], shots.get_target_cells())
+        self.assertEqual([5, 4, 3, 3], shots.get_remaining_ships())
+        random.seed(0)
+        player = montecarlo.WeightedPlayer(20)
+        player.get_monte_carlo_guess(shots, game.StepCounter())
+        self.assertGreater(player.effective_samples, 1)
+
+    def test_shots_queries(self):
+        """Verify ShotsGrid queries visit each cell a constant number of times."""
+        shots = get_shots()
+
+        def queries():
+            """Run each query once."""
+            shots.get_hit_cells()
+            shots.get_unguessed_cells()
+            shots.get_target_cells()
+            shots.get_target_cells(line=True)
+
+        self.check('shots_queries', queries)
+
+    def test_monte_carlo_guess(self):
+        """Verify the cells read by Monte Carlo sampling."""
+        shots = get_shots()
+        self.check('monte_carlo_guess', lambda: montecarlo.Player(20).get_monte_carlo_guess(shots, game.StepCounter()))
+
+    def test_weighted_guess(self):
+        """Verify the cells read by weighted Monte Carlo sampling."""
+        shots = get_shots()
+        self.check('weighted_guess',
+                   lambda: montecarlo.WeightedPlayer(20).get_monte_carlo_guess(shots, game.StepCounter()))
+
+    def test_exact_guess(self):
+        """Verify large state spaces are rejected before enumeration builds positions."""
+        shots = get_shots()
+        self.check('exact_guess', lambda: montecarlo.ExactPlayer(20).get_monte_carlo_guess(shots, game.StepCounter()))
+
+
+@unittest.skipUnless(os.getenv('TEST_PERFORMANCE'), "set TEST_PERFORMANCE to check timings")
+class TestTimings(unittest.TestCase):  # pylint: disable=R0904
+    """Regression tests of timings normalized by a calibration loop."""
+
+    @classmethod
+    def setUpClass(cls):  # pylint: disable=C0103
+        cls.baselines = load_baselines()['timings']
+        cls.calibration = calibrate()
+
+    def check(self, name, function):
+        """Verify the normalized duration of a function has not increased significantly."""
+        ratio = measure(function) / self.calibration
+        if os.getenv('TEST_PERFORMANCE') == 'update':  # pragma: no cover, manual baseline update
+            save_baseline('timings', name, round(ratio, 3))
+            return
+        baseline = self.baselines[name]
+        logging.info("{0}: {1:.3f} normalized duration (baseline {2})".format(name, ratio, baseline))
+        self.assertLessEqual(ratio, baseline * TIMINGS_TOLERANCE,
+                             "{0} regressed: {1:.3f} vs. baseline {2}".format(name, ratio, baseline))
+
+    def test_target_cells(self):
+        """Verify the speed of targeting queries."""
+        self.check('target_cells', target_cells)
+
+    def test_monte_carlo_guess(self):
+        """Verify the speed of Monte Carlo sampling."""
+        self.check('monte_carlo_guess', monte_carlo_guess)
+
+    def test_kernel_sample(self):
+        """Verify the speed of the Python sampling kernel."""
+        self.check('kernel_sample', kernel_sample)
+
+
+if __name__ == '__main__':
+    logging.basicConfig(format=settings.VERBOSE_LOGGING_FORMAT, level=settings.VERBOSE_LOGGING_LEVEL)
+    unittest.main()
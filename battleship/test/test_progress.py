@@ -0,0 +1,99 @@
+#!/usr/bin/env python
+
+"""
+Unit tests for the progress reporter.
+"""
+
+import os
+import json
+import tempfile
+import unittest
+import logging
+
+from battleship import progress
+from battleship import main
+from battleship import settings
+
+
+class FakeClock(object):
+    """Clock that advances only when told to."""
+
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeStream(object):
+    """Stream that stores the text written to it."""
+
+    def __init__(self):
+        self.text = ''
+
+    def write(self, text):
+        """Store text."""
+        self.text += text
+
+    def flush(self):
+        """Nothing to flush."""
+        pass
+
+    def getvalue(self):
+        """Return all stored text."""
+        return self.text
+
+
+class TestProgress(unittest.TestCase):  # pylint: disable=R0904
+    """Unit tests for the Progress class."""
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.stream = FakeStream()
+        handle, self.path = tempfile.mkstemp()
+        os.close(handle)
+        self.progress = progress.Progress(10, interval=1.0, stream=self.stream, metrics_path=self.path,
+                                          clock=self.clock)
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def test_interval(self):
+        """Verify progress is only reported after the interval."""
+        self.progress.update(0, 60, 100)
+        self.progress.update(0, 70, 100)
+        self.assertEqual('', self.stream.getvalue())
+        self.clock.now += 2
+        self.progress.update(25, 50, 800)
+        self.assertIn("3/10 games, 1.5 games/s, 500 steps/s, ETA 0:00:05, mean guesses 0:65.0 25:50.0",
+                      self.stream.getvalue())
+
+    def test_metrics(self):
+        """Verify metrics are appended to a file on each report."""
+        self.progress.update(0, 60, 100)
+        self.clock.now += 4
+        self.progress.update(0, 70, 100)
+        self.progress.close()
+        with open(self.path) as metrics:
+            lines = [json.loads(line) for line in metrics]
+        self.assertEqual(2, len(lines))
+        self.assertEqual(2, lines[0]['games'])
+        self.assertEqual(0.5, lines[0]['games_per_second'])
+        self.assertEqual(16, lines[0]['eta'])
+        self.assertEqual({'0': 65.0}, lines[1]['mean_guesses'])
+        self.assertTrue(self.stream.getvalue().endswith('\n'))
+
+    def test_unknown_eta(self):
+        """Verify the ETA is unknown before any time has passed."""
+        self.assertIsNone(self.progress.get_metrics()['eta'])
+
+    def test_run_metrics(self):
+        """Verify the main program can export progress metrics."""
+        self.assertTrue(main.run([0], 2, metrics_path=self.path))
+        with open(self.path) as metrics:
+            self.assertEqual(2, json.loads(metrics.readlines()[-1])['games'])
+
+
+if __name__ == '__main__':
+    logging.basicConfig(format=settings.VERBOSE_LOGGING_FORMAT, level=settings.VERBOSE_LOGGING_LEVEL)
+    unittest.main()
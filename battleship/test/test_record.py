@@ -0,0 +1,71 @@
+#!/usr/bin/env python
+
+"""
+Unit tests for the game record format.
+"""
+
+import os
+import tempfile
+import unittest
+import logging
+
+from battleship import record
+from battleship import game
+from battleship import settings
+
+
+class TestRecord(unittest.TestCase):  # pylint: disable=R0904
+    """Unit tests for the record module."""
+
+    def setUp(self):
+        handle, self.path = tempfile.mkstemp()
+        os.close(handle)
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def test_round_trip(self):
+        """Verify games can be written and read back."""
+        placements = game.PlacementGrid()
+        placements.place(1, 1, 5, 0)
+        placements.place(10, 10, 2, 90)
+        with record.Writer(self.path) as writer:
+            writer.write(25, placements, [(1, 1), (10, 10), (9, 10)])
+            writer.write(0, placements, [])
+        records = record.load(self.path)
+        self.assertEqual(2, len(records))
+        self.assertEqual(25, records[0].sample_size)
+        self.assertEqual(((1, 1), (10, 10), (9, 10)), records[0].shots)
+        self.assertEqual(3, records[0].guesses)
+        self.assertEqual(str(placements), str(records[1].get_placement_grid()))
+
+    def test_invalid_file(self):
+        """Verify files without a header are rejected."""
+        with open(self.path, 'wb') as data:
+            data.write(b'not a record')
+        self.assertRaises(ValueError, record.load, self.path)
+
+    def test_empty_file(self):
+        """Verify empty files are rejected."""
+        self.assertRaises(ValueError, record.load, self.path)
+
+    def test_truncated_file(self):
+        """Verify truncated records are rejected."""
+        placements = game.PlacementGrid()
+        with record.Writer(self.path) as writer:
+            writer.write(1, placements, [(1, 1), (2, 2)])
+        with open(self.path, 'rb') as data:
+            content = data.read()
+        for size in (len(content) - 1, len(record.MAGIC) + 2):
+            with open(self.path, 'wb') as data:
+                data.write(content[:size])
+            self.assertRaises(ValueError, record.load, self.path)
+
+    def test_large_grid(self):
+        """Verify grids with too many cells cannot be recorded."""
+        self.assertRaises(ValueError, record.encode, 0, game.PlacementGrid(20, 20), [])
+
+
+if __name__ == '__main__':
+    logging.basicConfig(format=settings.VERBOSE_LOGGING_FORMAT, level=settings.VERBOSE_LOGGING_LEVEL)
+    unittest.main()
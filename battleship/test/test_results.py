@@ -0,0 +1,104 @@
+#!/usr/bin/env python
+
+"""
+Unit tests for the columnar results store.
+"""
+
+import os
+import math
+import tempfile
+import unittest
+import logging
+
+from battleship import results
+from battleship import settings
+
+
+class TestResults(unittest.TestCase):  # pylint: disable=R0904
+    """Unit tests for the results module."""
+
+    def setUp(self):
+        self.results = results.Results()
+        self.results.add(0, 60, 1000, 6, strategy='naive', seed=1)
+        self.results.add(0, 70, 1200, 5.4, strategy='naive', seed=2)
+        self.results.add(0, 65, 1100, 5.1, seed=3, timings={'target': 1.5})
+        self.results.add(25, 55, 2000, 10.5, timings={'target': 2.5, 'sample': 8.0})
+
+    def test_add(self):
+        """Verify games are stored in typed columns."""
+        self.assertEqual(4, len(self.results))
+        self.assertEqual(['naive', 'naive', 'montecarlo', 'montecarlo'], self.results.get_column('strategy'))
+        self.assertEqual([1, 2, 3, results.NO_SEED], list(self.results.get_column('seed')))
+        self.assertTrue(math.isnan(self.results.get_column('sample_duration')[0]))
+        self.assertRaises(ValueError, self.results.add, 0, 60, 1000, 6, seed=-1)
+        self.assertRaises(ValueError, self.results.add, 0, 60, 1000, 6, seed=results.MAX_SEED + 1)
+        self.assertEqual(4, len(self.results))
+
+    def test_where(self):
+        """Verify games are selected by column values."""
+        self.assertEqual(2, len(self.results.where(strategy='naive')))
+        self.assertEqual(1, len(self.results.where(strategy='montecarlo', sample_size=0)))
+        self.assertEqual(0, len(self.results.where(strategy='unknown')))
+
+    def test_group_by(self):
+        """Verify games are grouped by one or more columns."""
+        groups = self.results.group_by('sample_size')
+        self.assertEqual([0, 25], sorted(groups))
+        self.assertEqual([60, 70, 65], list(groups[0].get_column('guesses')))
+        groups = self.results.group_by('strategy', 'sample_size')
+        self.assertEqual([('montecarlo', 0), ('montecarlo', 25), ('naive', 0)], sorted(groups))
+
+    def test_summarize(self):
+        """Verify groups are aggregated."""
+        aggregates = self.results.summarize()
+        self.assertEqual(3, aggregates[0].count)
+        self.assertAlmostEqual(65.0, aggregates[0].guesses.mean)
+        self.assertAlmostEqual(1100.0, aggregates[0].steps.mean)
+        self.assertEqual(2, self.results.summarize('strategy')['naive'].count)
+        self.assertAlmostEqual(2.0, self.results.mean('target_duration'))
+        self.assertIsNone(results.Results().mean('sample_duration'))
+
+    def test_get_games(self):
+        """Verify games are listed by sample size or other columns for reports."""
+        self.assertEqual({0: [(60, 1000, 6), (70, 1200, 5.4), (65, 1100, 5.1)], 25: [(55, 2000, 10.5)]},
+                         self.results.get_games())
+        self.assertEqual([('montecarlo', 0), ('montecarlo', 25), ('naive', 0)],
+                         sorted(self.results.get_games('strategy', 'sample_size')))
+
+    def test_extend(self):
+        """Verify results are combined with their strategies."""
+        other = results.Results()
+        other.add(10, 50, 500, 1.0, strategy='parity')
+        other.add(10, 52, 500, 1.0, strategy='naive')
+        self.results.extend(other)
+        self.assertEqual(6, len(self.results))
+        self.assertEqual(['parity', 'naive'], self.results.get_column('strategy')[4:])
+
+    def test_save_load(self):
+        """Verify results can be saved and loaded."""
+        handle, path = tempfile.mkstemp()
+        os.close(handle)
+        try:
+            self.assertTrue(self.results.save(path))
+            loaded = results.load(path)
+            self.assertEqual(self.results.get_column('strategy'), loaded.get_column('strategy'))
+            for name, _typecode in results.COLUMNS[1:-2]:
+                self.assertEqual(self.results.get_column(name), loaded.get_column(name))
+            self.assertAlmostEqual(8.0, loaded.mean('sample_duration'))
+            with open(path, 'rb') as data:
+                content = data.read()
+            for size in (len(results.MAGIC), len(results.MAGIC) + results.HEADER.size + 3, len(content) - 8,
+                         len(content) - 1):
+                with open(path, 'wb') as data:
+                    data.write(content[:size])
+                self.assertRaises(ValueError, results.load, path)
+            with open(path, 'wb') as data:
+                data.write(b'invalid')
+            self.assertRaises(ValueError, results.load, path)
+        finally:
+            os.remove(path)
+
+
+if __name__ == '__main__':
+    logging.basicConfig(format=settings.VERBOSE_LOGGING_FORMAT, level=settings.VERBOSE_LOGGING_LEVEL)
+    unittest.main()
@@ -5,11 +5,13 @@ Unit tests for the Scilab functions.
 """
 
 import os
+import tempfile
 import unittest
 import logging
 
 from battleship import scilab
 from battleship import montecarlo
+from battleship import stats
 from battleship import settings
 
 FILES = os.path.join(os.path.dirname(__file__), 'files')
@@ -38,6 +40,31 @@ class TestScilab(unittest.TestCase):  # pylint: disable=R0904
         self.assertTrue(scilab.write_graph(self.RESULTS, GRAPH_PATH))
         self.assertTrue(os.path.isfile(GRAPH_PATH))
 
+    def test_write_summary(self):
+        """Verify summary graph code is written to a file."""
+        handle, path = tempfile.mkstemp()
+        os.close(handle)
+        try:
+            self.assertTrue(scilab.write_summary(stats.aggregate(self.RESULTS), path))
+            with open(path) as graph:
+                text = graph.read()
+        finally:
+            os.remove(path)
+        self.assertIn("guesses_mean   = [62.5           54.5           ];", text)
+
+    def test_write_empty(self):
+        """Verify nothing is written when there are no results."""
+        path = os.path.join(tempfile.gettempdir(), 'battleship-empty.sce')
+        self.assertTrue(scilab.write_graph({}, path))
+        self.assertTrue(scilab.write_summary({}, path))
+        self.assertFalse(os.path.exists(path))
+
+    def test_format_number(self):
+        """Verify numbers are formatted for Scilab code."""
+        self.assertEqual('%nan', scilab.format_number(None))
+        self.assertEqual('0.333333', scilab.format_number(1 / 3.0))
+        self.assertEqual('7', scilab.format_number(7))
+
     def test_write_sample(self):
         """Verify graph code is written to a file."""
         log = [montecarlo.FrequencyGrid(), montecarlo.FrequencyGrid(), montecarlo.FrequencyGrid()]
@@ -51,6 +78,12 @@ class TestScilab(unittest.TestCase):  # pylint: disable=R0904
         self.assertEqual("6              10.5           ;\n                5.1            11             ",
                          scilab.get_column_text(self.RESULTS, 2))
 
+    def test_get_matrix_text_uneven(self):
+        """Verify missing results are padded in the matrix text."""
+        results = {0: [(60, 1000, 6)], 25: self.RESULTS[25]}
+        self.assertEqual("60             55             ;\n                %nan           54             ",
+                         scilab.get_column_text(results, 0))
+
     def test_counter(self):
         """Verify the simple counter functions."""
         counter = scilab.StepCounter()
@@ -0,0 +1,127 @@
+#!/usr/bin/env python
+
+"""
+Unit tests for the game server.
+"""
+
+import socket
+import unittest
+import logging
+
+from battleship import server
+from battleship import montecarlo
+from battleship import settings
+
+
+class FailingPlayer(montecarlo.Strategy):
+    """Strategy that cannot select a move."""
+
+    def get_guess(self, shots, counter, frequency_log=None, time_limit=None):
+        """Fail to select a move."""
+        raise ValueError("no move")
+
+
+@unittest.skipIf(server.asyncio is None, "asyncio is not available")
+class TestService(unittest.TestCase):  # pylint: disable=R0904
+    """Unit tests for the Service class."""
+
+    def setUp(self):
+        self.loop = server.asyncio.new_event_loop()
+        self.service = server.Service()
+
+    def tearDown(self):
+        self.loop.close()
+
+    def handle(self, line):
+        """Return the reply to a command."""
+        return self.loop.run_until_complete(self.service.handle(line, self.loop))
+
+    def test_guess(self):
+        """Verify guesses are scored."""
+        self.assertEqual("OK 1", self.handle("NEW"))
+        self.assertIn(self.handle("GUESS 1 1 1"), ("HIT", "MISS"))
+        self.assertEqual("ERROR already guessed (1,1)", self.handle("GUESS 1 1 1"))
+        self.assertEqual("ERROR cell is off the grid", self.handle("GUESS 1 11 11"))
+
+    def test_win(self):
+        """Verify a game can be won with computer moves."""
+        self.handle("NEW 0")
+        reply = None
+        while reply != "WON":
+            status, row, col, _samples = self.handle("MOVE 1").split()
+            self.assertEqual("OK", status)
+            reply = self.handle("GUESS 1 {0} {1}".format(row, col))
+
+    def test_time_limit(self):
+        """Verify a computer move can be limited in time."""
+        self.handle("NEW 1000000")
+        status, _row, _col, samples = self.handle("MOVE 1 0.05").split()
+        self.assertEqual("OK", status)
+        self.assertLess(int(samples), 1000000)
+
+    def test_move_in_progress(self):
+        """Verify commands for a game wait for its computer move."""
+        self.handle("NEW 0 naive")
+        match = self.service.matches[1]
+        move = self.service.handle("MOVE 1", self.loop)
+        guess = self.service.handle("GUESS 1 1 1", self.loop)
+        second = self.service.handle("MOVE 1", self.loop)
+        self.assertEqual(2, len(match.waiting))
+        self.assertTrue(self.loop.run_until_complete(move).startswith("OK "))
+        self.assertIn(self.loop.run_until_complete(guess), ("HIT", "MISS", "WON"))
+        status, row, col, _samples = self.loop.run_until_complete(second).split()
+        self.assertEqual("OK", status)
+        self.assertNotEqual((1, 1), (int(row), int(col)))
+        self.assertEqual(2, match.counter.value())
+        self.assertEqual([], match.waiting)
+
+    def test_move_error(self):
+        """Verify a failed computer move is reported and later commands still run."""
+        self.handle("NEW")
+        self.service.matches[1].player = FailingPlayer()
+        move = self.service.handle("MOVE 1", self.loop)
+        guess = self.service.handle("GUESS 1 1 1", self.loop)
+        self.assertEqual("ERROR no move", self.loop.run_until_complete(move))
+        self.assertIn(self.loop.run_until_complete(guess), ("HIT", "MISS"))
+        self.assertIsNone(self.service.matches[1].move)
+
+    def test_errors(self):
+        """Verify invalid commands are reported."""
+        self.assertEqual("ERROR unknown game: 2", self.handle("MOVE 2"))
+        self.assertEqual("ERROR unknown command: FIRE", self.handle("FIRE"))
+        self.assertEqual("ERROR unknown strategy: foo", self.handle("NEW 0 foo"))
+        self.assertEqual("ERROR sample size must not be negative: -5", self.handle("NEW -5"))
+        self.assertTrue(self.handle("GUESS one 1 1").startswith("ERROR "))
+        self.handle("NEW")
+        self.assertEqual("OK", self.handle("QUIT 1"))
+        self.assertEqual("ERROR unknown game: 1", self.handle("QUIT 1"))
+
+    def test_serve(self):
+        """Verify concurrent games can be played over a socket."""
+        listener = self.loop.run_until_complete(server.serve(self.service, port=0, loop=self.loop))
+        port = listener.sockets[0].getsockname()[1]
+
+        def client():
+            """Send commands for two games in a single request."""
+            connection = socket.create_connection((server.DEFAULT_HOST, port))
+            connection.sendall(b"NEW 5\nNEW 0\nMOVE 1\nMOVE 2\nQUIT 1\n")
+            data = b''
+            while data.count(b'\n') < 5:
+                data += connection.recv(1024)
+            connection.close()
+            return data.decode('ascii').splitlines()
+
+        try:
+            replies = self.loop.run_until_complete(self.loop.run_in_executor(None, client))
+        finally:
+            listener.close()
+            self.loop.run_until_complete(listener.wait_closed())
+        self.assertEqual(["OK 1", "OK 2"], replies[:2])
+        self.assertTrue(replies[2].startswith("OK "))
+        self.assertTrue(replies[3].startswith("OK "))
+        self.assertEqual("OK", replies[4])
+
+
+if __name__ == '__main__':
+    logging.basicConfig(format=settings.VERBOSE_LOGGING_FORMAT, level=settings.VERBOSE_LOGGING_LEVEL)
+    unittest.main()
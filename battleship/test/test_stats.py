@@ -0,0 +1,96 @@
+#!/usr/bin/env python
+
+"""
+Unit tests for the statistics functions.
+"""
+
+import os
+import tempfile
+import unittest
+import logging
+
+from battleship import stats
+from battleship import settings
+
+
+class TestStats(unittest.TestCase):  # pylint: disable=R0904
+    """Unit tests for the stats module."""
+
+    RESULTS = {0: [(60, 1000, 6),
+                   (65, 1100, 5.1),
+                   (70, 1200, 5.4)],
+               25: [(55, 2000, 10.5)]}
+
+    def test_statistic(self):
+        """Verify running statistics match the direct calculation."""
+        statistic = stats.Statistic()
+        for value in (2, 4, 4, 4, 5, 5, 7, 9):
+            statistic.add(value)
+        self.assertEqual(8, statistic.count)
+        self.assertAlmostEqual(5.0, statistic.mean)
+        self.assertAlmostEqual(32 / 7.0, statistic.variance())
+        self.assertEqual((2, 9), (statistic.minimum, statistic.maximum))
+        self.assertEqual(0.0, stats.Statistic().std())
+
+    def test_aggregate(self):
+        """Verify results are summarized for each sample size."""
+        aggregates = stats.aggregate(self.RESULTS)
+        self.assertEqual(3, aggregates[0].count)
+        self.assertAlmostEqual(65.0, aggregates[0].guesses.mean)
+        self.assertAlmostEqual(1100.0, aggregates[0].steps.mean)
+        self.assertEqual(1, aggregates[25].count)
+
+    def test_percentile(self):
+        """Verify percentiles are calculated from the histogram."""
+        aggregate = stats.Aggregate()
+        self.assertIsNone(aggregate.percentile(50))
+        for guesses in range(1, 101):
+            aggregate.add(guesses, 0, 0)
+        self.assertEqual(10, aggregate.percentile(10))
+        self.assertEqual(50, aggregate.percentile(50))
+        self.assertEqual(1, aggregate.percentile(0))
+        self.assertEqual(100, aggregate.percentile(100))
+
+    def test_write_csv(self):
+        """Verify summary statistics are written as CSV."""
+        handle, path = tempfile.mkstemp()
+        os.close(handle)
+        try:
+            self.assertTrue(stats.write_csv(stats.aggregate(self.RESULTS), path))
+            with open(path) as csv:
+                lines = csv.read().splitlines()
+        finally:
+            os.remove(path)
+        self.assertEqual(','.join(stats.CSV_COLUMNS), lines[0])
+        self.assertTrue(lines[1].startswith("0,3,65,5,60,70,60,65,70,1100,100,"))
+        self.assertEqual(3, len(lines))
+
+    def test_format_summary(self):
+        """Verify a summary table is formatted for each sample size."""
+        text = stats.format_summary(stats.aggregate(self.RESULTS))
+        self.assertEqual(3, len(text.splitlines()))
+
+    def test_grouped_by_strategy(self):
+        """Verify aggregates of several strategies are reported separately."""
+        aggregates = dict((('naive', sample_size), summary)
+                          for sample_size, summary in stats.aggregate(self.RESULTS).items())
+        aggregates[('parity', 0)] = stats.Aggregate()
+        aggregates[('parity', 0)].add(50, 10, 1.0)
+        lines = stats.format_summary(aggregates).splitlines()
+        self.assertEqual(4, len(lines))
+        self.assertEqual(['parity', '0', '1'], lines[3].split()[:3])
+        handle, path = tempfile.mkstemp()
+        os.close(handle)
+        try:
+            stats.write_csv(aggregates, path)
+            with open(path) as csv:
+                lines = csv.read().splitlines()
+        finally:
+            os.remove(path)
+        self.assertEqual('strategy,' + ','.join(stats.CSV_COLUMNS), lines[0])
+        self.assertTrue(lines[3].startswith("parity,0,1,50,"))
+
+
+if __name__ == '__main__':
+    logging.basicConfig(format=settings.VERBOSE_LOGGING_FORMAT, level=settings.VERBOSE_LOGGING_LEVEL)
+    unittest.main()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python
+
+"""
+Unit tests for the distributed sweep functions.
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+import logging
+
+from battleship import sweep
+from battleship import main
+from battleship import settings
+
+
+class TestSweep(unittest.TestCase):  # pylint: disable=R0904
+    """Unit tests for the sweep module."""
+
+    def setUp(self):
+        self.queue = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.queue)
+
+    def test_split(self):
+        """Verify a sweep is split into chunks."""
+        self.assertEqual(4, sweep.split(self.queue, [0, 1], 5, chunk_size=3))
+        self.assertEqual((4, 0, 0), sweep.get_status(self.queue))
+        chunk = sweep.claim(self.queue)
+        self.assertEqual((0, 0, 3), (chunk['sample_size'], chunk['seed'], chunk['count']))
+        self.assertEqual((3, 1, 0), sweep.get_status(self.queue))
+
+    def test_work_and_merge(self):
+        """Verify several workers can complete a sweep."""
+        sweep.split(self.queue, [0, 1], 3, chunk_size=2)
+        self.assertEqual(1, sweep.work(self.queue, limit=1))
+        self.assertEqual(3, sweep.work(self.queue))
+        self.assertEqual((0, 0, 4), sweep.get_status(self.queue))
+        results = sweep.merge(self.queue).group_by('sample_size')
+        self.assertEqual([0, 1], sorted(results))
+        self.assertEqual(3, len(results[0]))
+        self.assertEqual(3, len(results[1]))
+        self.assertEqual([0, 1, 2], sorted(results[1].get_column('seed')))
+
+    def test_requeue(self):
+        """Verify abandoned claims are returned to the queue."""
+        sweep.split(self.queue, [0], 1)
+        sweep.claim(self.queue)
+        self.assertEqual(0, sweep.requeue(self.queue, timeout=60))
+        self.assertEqual(1, sweep.requeue(self.queue, timeout=0))
+        self.assertEqual((1, 0, 0), sweep.get_status(self.queue))
+
+    def test_claim_finished(self):
+        """Verify chunks already completed by a worker presumed lost are not played again."""
+        sweep.split(self.queue, [0], 1)
+        name = os.listdir(os.path.join(self.queue, sweep.PENDING))[0]
+        chunk = sweep.read_json(os.path.join(self.queue, sweep.PENDING, name))
+        chunk['results'] = [[17, 17, 0.1]]
+        sweep.write_json(os.path.join(self.queue, sweep.DONE, name), chunk)
+        with open(os.path.join(self.queue, sweep.PENDING, 'notes.txt'), 'w') as notes:
+            notes.write("not a chunk")
+        self.assertIsNone(sweep.claim(self.queue))
+        self.assertEqual((0, 0, 1), sweep.get_status(self.queue))
+        self.assertEqual(['notes.txt'], os.listdir(os.path.join(self.queue, sweep.PENDING)))
+
+    def test_merge_partial(self):
+        """Verify the completed chunks of an unfinished sweep can be merged."""
+        sweep.split(self.queue, [0], 2, chunk_size=1)
+        sweep.work(self.queue, limit=1)
+        sweep.claim(self.queue)
+        self.assertEqual((0, 1, 1), sweep.get_status(self.queue))
+        self.assertEqual(1, len(sweep.merge(self.queue)))
+
+    def test_seeds(self):
+        """Verify chunks are reproducible from their seeds."""
+        chunk = {'strategy': 'montecarlo', 'sample_size': 0, 'seed': 42, 'count': 2}
+        first = [result[0] for result in sweep.play(chunk)]
+        second = [result[0] for result in sweep.play(chunk)]
+        self.assertEqual(first, second)
+
+    def test_distribute(self):
+        """Verify the main program can split, work, and merge a sweep."""
+        path = os.path.join(self.queue, 'results.csv')
+        self.assertFalse(main.distribute([], 0, merge_path=self.queue))
+        self.assertTrue(main.distribute([0], 2, split_path=self.queue))
+        self.assertTrue(main.distribute([], 0, work_path=self.queue, merge_path=self.queue, csv_path=path))
+        self.assertTrue(os.path.isfile(path))
+
+    def test_distribute_seed(self):
+        """Verify a split sweep is seeded from the given seed."""
+        self.assertFalse(main.distribute([0], 2, split_path=self.queue, seed=-1))
+        self.assertFalse(main.distribute([0], 2, split_path=self.queue, strategy='unknown'))
+        self.assertTrue(main.distribute([0], 2, split_path=self.queue, seed=5))
+        sweep.work(self.queue)
+        self.assertEqual([5, 6], sorted(sweep.merge(self.queue).get_column('seed')))
+
+
+if __name__ == '__main__':
+    logging.basicConfig(format=settings.VERBOSE_LOGGING_FORMAT, level=settings.VERBOSE_LOGGING_LEVEL)
+    unittest.main()
@@ -19,7 +19,8 @@ setuptools.setup(
 
     packages=setuptools.find_packages(),
 
-    entry_points={'console_scripts': [__cli__ + " = battleship.main:main"]},
+    entry_points={'console_scripts': [__cli__ + " = battleship.main:main",
+                                      __cli__ + "-server = battleship.server:main"]},
 
     long_description=open('README.rst').read(),
     license='LGPL',